@@ -21,12 +21,34 @@ load_dotenv(find_dotenv())
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 UNSPLASH_ACCESS_KEY = os.getenv('UNSPLASH_ACCESS_KEY')
+UNSPLASH_API_URL = os.getenv('UNSPLASH_API_URL', 'https://api.unsplash.com/search/photos')
+UNSPLASH_TIMEOUT = float(os.getenv('UNSPLASH_TIMEOUT', '5'))
+UNSPLASH_POOL_TTL = int(os.getenv('UNSPLASH_POOL_TTL', '3600'))
+UNSPLASH_RETRY_DELAY = int(os.getenv('UNSPLASH_RETRY_DELAY', '60'))
 
+# 'postgresql', or 'sqlite' for a db.sqlite3 file in BASE_DIR (searched through FTS5).
+DB_ENGINE = os.getenv('DB_ENGINE', 'postgresql')
 POSTGRES_HOST = os.getenv('POSTGRES_HOST', 'localhost')
 POSTGRES_PORT = os.getenv('POSTGRES_PORT', '5432')
 POSTGRES_USER = os.getenv('POSTGRES_USER', 'postgres')
 POSTGRES_PASSWORD = os.getenv('POSTGRES_PASSWORD', 'password')
 POSTGRES_DB = os.getenv('POSTGRES_DB', 'database')
+# Seconds a connection is kept open for later requests of the same thread; 0
+# closes it after every request. Keep 0 under ASGI, where every request runs in
+# a new thread: use POSTGRES_POOL there instead.
+POSTGRES_CONN_MAX_AGE = int(os.getenv('POSTGRES_CONN_MAX_AGE', '0'))
+POSTGRES_CONN_HEALTH_CHECKS = os.getenv('POSTGRES_CONN_HEALTH_CHECKS', 'True') == 'True'
+# In-process connection pool shared by the threads of each worker.
+POSTGRES_POOL = os.getenv('POSTGRES_POOL', 'False') == 'True'
+POSTGRES_POOL_MAX_SIZE = int(os.getenv('POSTGRES_POOL_MAX_SIZE', '20'))
+POSTGRES_POOL_TIMEOUT = float(os.getenv('POSTGRES_POOL_TIMEOUT', '10'))
+POSTGRES_POOL_MAX_LIFETIME = float(os.getenv('POSTGRES_POOL_MAX_LIFETIME', '3600'))
+
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache')
+CACHE_LOCATION = os.getenv('CACHE_LOCATION', 'spacesite')
+# Per-process caches are not seen by the other gunicorn workers.
+CACHE_SHARED = CACHE_BACKEND not in ('django.core.cache.backends.locmem.LocMemCache',
+                                     'django.core.cache.backends.dummy.DummyCache')
 
 
 # Quick-start development settings - unsuitable for production
@@ -36,9 +58,9 @@ POSTGRES_DB = os.getenv('POSTGRES_DB', 'database')
 SECRET_KEY = os.getenv('SECRET_KEY')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv('DEBUG', 'True') == 'True'
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [host.strip() for host in os.getenv('ALLOWED_HOSTS', '').split(',') if host.strip()]
 
 
 # Application definition
@@ -57,8 +79,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'SpaceSite_django_app.middleware.PerformanceMiddleware',
+    'SpaceSite_django_app.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'SpaceSite_django_app.middleware.TopMessageMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -66,10 +92,36 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# Per-request DB/template/HTTP timings in a Server-Timing response header.
+SERVER_TIMING = os.getenv('SERVER_TIMING', 'True') == 'True'
+# /metrics requires an "Authorization: Bearer <token>" header with this token.
+# When empty, /metrics is only served with DEBUG on.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Response compression (SpaceSite_django_app.middleware.CompressionMiddleware). Brotli is used when the
+# package is installed; quality 4 costs about as much CPU as gzip level 6 and gives smaller output.
+COMPRESSION_BROTLI = os.getenv('COMPRESSION_BROTLI', 'True') == 'True'
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '4'))
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+
+# cached_db reads sessions from the cache and only falls back to the DB on a miss. It needs a
+# shared cache: logout only evicts the session from the cache of the worker that handled it, and
+# the other workers would keep accepting the cookie. Without one, sessions are read from the DB.
+SESSION_ENGINE = os.getenv('SESSION_ENGINE') or (
+    'django.contrib.sessions.backends.cached_db' if CACHE_SHARED else 'django.contrib.sessions.backends.db')
+
+# Where set_top_message keeps flash messages: a signed cookie (no DB writes) or the session.
+TOP_MESSAGE_STORAGE = os.getenv('TOP_MESSAGE_STORAGE', 'SpaceSite_django_app.flash.CookieTopMessageStorage')
+TOP_MESSAGE_MAX_AGE = 300
+
+# 'stateless' builds the API user from the JWT claims with no DB query per request;
+# 'db' loads the user row for every request.
+API_AUTH_MODE = os.getenv('API_AUTH_MODE', 'stateless')
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
+        'SpaceSite_django_app.authentication.StatelessJWTAuthentication'
+        if API_AUTH_MODE == 'stateless' else
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
 }
@@ -79,6 +131,9 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
+    'TOKEN_OBTAIN_SERIALIZER': 'SpaceSite_django_app.authentication.MyTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'SpaceSite_django_app.authentication.MyTokenRefreshSerializer',
+    'TOKEN_USER_CLASS': 'SpaceSite_django_app.authentication.ClaimsUser',
 }
 
 
@@ -115,8 +170,57 @@ DATABASES = {
         'PASSWORD': POSTGRES_PASSWORD,
         'HOST': POSTGRES_HOST,
         'PORT': POSTGRES_PORT,
+        'CONN_MAX_AGE': POSTGRES_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': POSTGRES_CONN_HEALTH_CHECKS,
+    }
+}
+
+if DB_ENGINE == 'sqlite':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
     }
+elif POSTGRES_POOL:
+    DATABASES['default'].update({
+        'ENGINE': 'SpaceSite_django_app.postgresql_pool',
+        # Closing a connection returns it to the pool.
+        'CONN_MAX_AGE': 0,
+        'OPTIONS': {
+            'pool': {
+                'max_size': POSTGRES_POOL_MAX_SIZE,
+                'timeout': POSTGRES_POOL_TIMEOUT,
+                'max_lifetime': POSTGRES_POOL_MAX_LIFETIME,
+            },
+        },
+    })
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': CACHE_LOCATION,
+    },
+    # Revoked JWT IDs. Evicting one would let a revoked token through, so this
+    # cache must never cull: keep MAX_ENTRIES high, or use a Redis instance
+    # with maxmemory-policy noeviction. It must also be shared by every worker
+    # process (Redis, memcached or the database): with the per-process default,
+    # refresh tokens are checked in the database instead and an access token
+    # revoked at logout stays usable in the other workers until it expires.
+    'tokens': {
+        'BACKEND': os.getenv('TOKEN_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('TOKEN_CACHE_LOCATION', 'spacesite-tokens'),
+    },
 }
+if not CACHES['tokens']['BACKEND'].startswith(('django.core.cache.backends.redis.',
+                                               'django.core.cache.backends.memcached.')):
+    # Redis and memcached take their own options; the others cull past MAX_ENTRIES.
+    CACHES['tokens']['OPTIONS'] = {'MAX_ENTRIES': 10_000_000}
+
+POST_FRAGMENT_TIMEOUT = int(os.getenv('POST_FRAGMENT_TIMEOUT', '86400'))
+# Anonymous home feed page cache, in seconds; 0 disables it. Needs a shared CACHE_BACKEND.
+FEED_PAGE_CACHE_TIMEOUT = int(os.getenv('FEED_PAGE_CACHE_TIMEOUT', '0'))
 
 
 # Password validation
@@ -157,11 +261,40 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / "static"]
+STATIC_ROOT = os.getenv('STATIC_ROOT', BASE_DIR / 'staticfiles')
+
+# Without DEBUG, collectstatic writes content-hashed copies of every file plus
+# gzip and Brotli variants, and WhiteNoise serves the hashed names with a
+# one-year immutable Cache-Control. The manifest must exist, so run
+# collectstatic before starting the server.
+STATICFILES_BACKEND = os.getenv(
+    'STATICFILES_BACKEND',
+    'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG else
+    'whitenoise.storage.CompressedManifestStaticFilesStorage',
+)
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': STATICFILES_BACKEND,
+    },
+}
 
 # Media settings
+# Django serves media only when DEBUG is on; otherwise the web server in front
+# of it must (see deploy/nginx.conf).
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Avatar thumbnails, generated off the request thread (see SpaceSite_django_app/avatars.py)
+AVATAR_THUMBNAIL_SIZES = (64, 256)
+AVATAR_FORMAT = os.getenv('AVATAR_FORMAT', 'WEBP')  # WEBP or JPEG
+AVATAR_QUALITY = 85
+AVATAR_MAX_PIXELS = 40_000_000
+AVATAR_WORKERS = int(os.getenv('AVATAR_WORKERS', '2'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -0,0 +1,174 @@
+# api.py
+import hashlib
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from rest_framework import status
+from rest_framework.permissions import BasePermission
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+
+from .models import Post
+from .pagination import paginate_by_cursor
+from .search import MAX_OFFSET, search_posts
+
+# Public field name -> Post.objects.values() column.
+POST_API_FIELDS = {
+    'id': 'id',
+    'content': 'content',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+    'author_id': 'user_id',
+    'author': 'user__username',
+}
+
+
+def parse_fields(request):
+    """
+    Return the fields requested with `?fields=a,b`, or all fields.
+
+    Returns:
+        list | None: Field names, or None if an unknown field was requested.
+    """
+    value = request.query_params.get('fields')
+    if not value:
+        return list(POST_API_FIELDS)
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    if not fields or any(field not in POST_API_FIELDS for field in fields):
+        return None
+    return fields
+
+
+def _unknown_fields_response():
+    return Response({'detail': f"Unknown field. Allowed fields: {', '.join(POST_API_FIELDS)}"},
+                    status=status.HTTP_400_BAD_REQUEST)
+
+
+class IsAdminRole(BasePermission):
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated and request.user.role == 'admin')
+
+
+class PostFeedAPIView(APIView):
+    """
+    Read-only JSON feed of posts, newest first, with cursor pagination.
+
+    Rows are fetched with values() and serialized as plain dicts, skipping
+    model instantiation and serializer classes.
+    """
+    max_limit = 100
+
+    def get(self, request):
+        fields = parse_fields(request)
+        if fields is None:
+            return _unknown_fields_response()
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), self.max_limit)
+        except ValueError:
+            limit = 20
+
+        # id, created_at and updated_at are always read: the cursor and the ETag need them.
+        columns = {POST_API_FIELDS[field] for field in fields} | {'id', 'created_at', 'updated_at'}
+        page = paginate_by_cursor(Post.objects.values(*columns), request.query_params.get('cursor'), limit)
+
+        results = [{field: row[POST_API_FIELDS[field]] for field in fields} for row in page]
+        url = request.build_absolute_uri()
+        data = {
+            'next': replace_query_param(url, 'cursor', page.next_cursor) if page.has_next() else None,
+            'previous': (replace_query_param(url, 'cursor', page.previous_cursor) if page.has_previous()
+                         else None),
+            'results': results,
+        }
+
+        versions = [(row['id'], row['updated_at'], row.get('user__username')) for row in page]
+        fingerprint = json.dumps([fields, versions, data['next'], data['previous']], cls=DjangoJSONEncoder)
+        etag = f'"{hashlib.md5(fingerprint.encode()).hexdigest()}"'
+        not_modified = get_conditional_response(request._request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+        response = Response(data)
+        response['ETag'] = etag
+        return response
+
+
+class PostExportAPIView(APIView):
+    """
+    Stream every post as newline-delimited JSON, oldest first (admin only).
+
+    Rows come from QuerySet.iterator(), which uses a server-side cursor on
+    PostgreSQL, so memory use stays flat whatever the table size. Under ASGI
+    the stream is an async generator fetching one chunk at a time; Django
+    would drain a sync iterator into a list before sending the first byte. `?after_id=` resumes an interrupted export.
+    """
+    permission_classes = [IsAdminRole]
+    chunk_size = 2000
+
+    def get(self, request):
+        fields = parse_fields(request)
+        if fields is None:
+            return _unknown_fields_response()
+
+        posts = Post.objects.order_by('id')
+        after_id = request.query_params.get('after_id')
+        if after_id and after_id.isdigit():
+            posts = posts.filter(id__gt=int(after_id))
+        rows = posts.values_list(*[POST_API_FIELDS[field] for field in fields])
+
+        encoder = DjangoJSONEncoder(separators=(',', ':'))
+
+        def stream():
+            for row in rows.iterator(chunk_size=self.chunk_size):
+                yield encoder.encode(dict(zip(fields, row))) + '\n'
+
+        async def astream():
+            # Chunks are fetched in the sync thread: QuerySet.aiterator() runs a
+            # values_list() query from the event loop and fails on Django 5.0.
+            iterator = rows.iterator(chunk_size=self.chunk_size)
+            while chunk := await sync_to_async(list)(islice(iterator, self.chunk_size)):
+                for row in chunk:
+                    yield encoder.encode(dict(zip(fields, row))) + '\n'
+
+        content = astream() if isinstance(request._request, ASGIRequest) else stream()
+        response = StreamingHttpResponse(content, content_type='application/x-ndjson')
+        response['Content-Disposition'] = 'attachment; filename="posts.ndjson"'
+        return response
+
+
+class PostSearchAPIView(APIView):
+    """
+    Full-text search over posts, best matches first, with highlighted snippets.
+    Paging stops at search.MAX_OFFSET.
+    """
+    max_limit = 100
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'detail': 'The q parameter is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), self.max_limit)
+            offset = min(max(int(request.query_params.get('offset', 0)), 0), MAX_OFFSET)
+        except ValueError:
+            limit, offset = 20, 0
+
+        rows = search_posts(query, limit + 1, offset)
+        url = request.build_absolute_uri()
+        results = [{
+            'id': row['post'].id,
+            'author': row['post'].user.username,
+            'created_at': row['post'].created_at,
+            'snippet': row['snippet'],
+            'rank': row['rank'],
+        } for row in rows[:limit]]
+        return Response({
+            'next': (replace_query_param(url, 'offset', offset + limit)
+                     if len(rows) > limit and offset + limit <= MAX_OFFSET else None),
+            'results': results,
+        })
@@ -0,0 +1,128 @@
+# authentication.py
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .blacklist import CachedRefreshToken, is_token_revoked, revoke_token
+
+ACCESS_TOKEN_COOKIE = 'access_token'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def set_user_claims(token, user):
+    token['username'] = user.username
+    token['role'] = user.role
+
+
+def token_for_user(user):
+    """
+    Return a refresh token for `user` carrying the claims ClaimsUser reads.
+    """
+    token = CachedRefreshToken.for_user(user)
+    set_user_claims(token, user)
+    return token
+
+
+class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        return token_for_user(user)
+
+
+class MyTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh with the user's current name and role in the new tokens.
+
+    Rotation would otherwise copy the claims of the first token forward for
+    as long as the client keeps refreshing. The user is loaded once per
+    refresh, and missing or inactive users get no new tokens.
+    """
+    token_class = CachedRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = get_user_model().objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh.get(api_settings.USER_ID_CLAIM)}).first()
+        if not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed('No active account found for the given token.', code='no_active_account')
+        set_user_claims(refresh, user)
+
+        data = {'access': str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+        return data
+
+
+class ClaimsUser(TokenUser):
+    """
+    Request user built from the access token claims, without a database query.
+
+    Claims are fixed when the token is issued and rewritten from the database
+    on every refresh, so a role change, rename or deactivation takes effect
+    once the user's current access token expires.
+    """
+
+    @cached_property
+    def role(self):
+        return self.token.get('role', 'user')
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    Authenticate with an access token from the Authorization header or the
+    `access_token` cookie, without touching the session or the user table.
+
+    The cookie is only accepted for safe methods, so it cannot be used for
+    cross-site request forgery. Revoked tokens are looked up in the cache.
+    An invalid, expired or revoked cookie is ignored rather than rejected, so
+    a stale cookie does not lock the browser out of public pages or logout.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is not None:
+            raw_token = self.get_raw_token(header)
+            if raw_token is None:
+                return None
+            return self.authenticate_token(raw_token)
+        if request.method not in SAFE_METHODS:
+            return None
+        raw_token = request.COOKIES.get(ACCESS_TOKEN_COOKIE)
+        if not raw_token:
+            return None
+        try:
+            return self.authenticate_token(raw_token)
+        except InvalidToken:
+            return None
+
+    def authenticate_token(self, raw_token):
+        validated_token = self.get_validated_token(raw_token)
+        if is_token_revoked(validated_token[api_settings.JTI_CLAIM]):
+            raise InvalidToken('Token has been revoked')
+        return self.get_user(validated_token), validated_token
+
+
+def revoke_access_token_cookie(request, response):
+    """
+    Revoke the access token stored in the request's cookie and delete the cookie.
+    """
+    raw_token = request.COOKIES.get(ACCESS_TOKEN_COOKIE)
+    if raw_token:
+        try:
+            token = AccessToken(raw_token)
+            revoke_token(token[api_settings.JTI_CLAIM], token['exp'])
+        except TokenError:
+            pass
+    response.delete_cookie(ACCESS_TOKEN_COOKIE)
+    return response
@@ -0,0 +1,87 @@
+# avatars.py
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from PIL import Image, ImageOps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import UserProfile
+from .storage import avatar_storage
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=settings.AVATAR_WORKERS, thread_name_prefix='avatar')
+
+_EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg'}
+
+
+def thumbnail_name(avatar_hash, size):
+    """
+    Return the storage name of the `size` px thumbnail of the avatar whose
+    content hashes to `avatar_hash`.
+    """
+    return f'avatars/thumbs/{avatar_hash}_{size}.{_EXTENSIONS[settings.AVATAR_FORMAT]}'
+
+
+def generate_thumbnails(name):
+    """
+    Write square thumbnails of avatar `name` in every AVATAR_THUMBNAIL_SIZES size.
+
+    The image is re-encoded from pixels only, so EXIF and other metadata
+    (camera, GPS position) never reach the thumbnails. Thumbnails are named
+    after the original's content hash, so existing ones are reused.
+
+    Returns:
+        str: SHA-256 hex digest of the original file.
+    """
+    with avatar_storage.open(name) as file:
+        content = file.read()
+    avatar_hash = hashlib.sha256(content).hexdigest()
+
+    with Image.open(BytesIO(content)) as image:
+        # Image.open only parses the header, so this check runs before decoding.
+        if image.width * image.height > settings.AVATAR_MAX_PIXELS:
+            raise ValueError(f'{name} is {image.width}x{image.height}, above AVATAR_MAX_PIXELS')
+        image = ImageOps.exif_transpose(image).convert('RGB')
+        for size in settings.AVATAR_THUMBNAIL_SIZES:
+            thumb_name = thumbnail_name(avatar_hash, size)
+            if avatar_storage.exists(thumb_name):
+                continue
+            thumbnail = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+            buffer = BytesIO()
+            thumbnail.save(buffer, settings.AVATAR_FORMAT, quality=settings.AVATAR_QUALITY)
+            avatar_storage.save(thumb_name, ContentFile(buffer.getvalue()))
+
+    return avatar_hash
+
+
+def process_avatar(name):
+    """
+    Generate the thumbnails of avatar `name` and record its hash on the
+    profiles still using it, which marks the thumbnails as ready.
+    """
+    avatar_hash = generate_thumbnails(name)
+    UserProfile.objects.filter(user_photo=name).update(avatar_hash=avatar_hash, updated_at=timezone.now())
+
+
+def _process_avatar(name):
+    close_old_connections()
+    try:
+        process_avatar(name)
+    except Exception:
+        logger.exception('Avatar processing failed for %s', name)
+    finally:
+        close_old_connections()
+
+
+def schedule_avatar_processing(name):
+    """
+    Generate the thumbnails of avatar `name` in the worker pool once the
+    current transaction commits, so the upload request returns immediately.
+    """
+    transaction.on_commit(lambda: _executor.submit(_process_avatar, name))
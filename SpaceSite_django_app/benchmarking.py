@@ -0,0 +1,218 @@
+# benchmarking.py
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+
+
+def time_calls(func, repeat):
+    """
+    Call `func` `repeat` times after one untimed warm-up call.
+
+    Returns:
+        list[float]: Duration of every timed call, in milliseconds.
+    """
+    func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def percentiles(samples):
+    """
+    Return the (p50, p95) of `samples`.
+    """
+    if len(samples) < 2:
+        return samples[0], samples[0]
+    cuts = statistics.quantiles(samples, n=100, method='inclusive')
+    return cuts[49], cuts[94]
+
+
+def write_table(stdout, header, rows):
+    """
+    Write `rows` under `header` as left-aligned text columns.
+    """
+    rows = [[str(cell) for cell in row] for row in [header, *rows]]
+    widths = [max(len(row[column]) for row in rows) for column in range(len(header))]
+    for row in rows:
+        stdout.write('  '.join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip())
+
+
+def logged_in_client(user=None):
+    """
+    Return a test client for timing views in-process, logged in as `user`.
+    Requests go to 'testserver', so run them under
+    override_settings(ALLOWED_HOSTS=['testserver']).
+    """
+    client = Client()
+    if user is not None:
+        client.force_login(user)
+    return client
+
+
+class QueryCounter:
+    """
+    Count the queries run on `connection` while installed with
+    connection.execute_wrapper(). Unlike CaptureQueriesContext, the count
+    survives the connection being closed at the end of a request.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def time_page(client, url, repeat, **extra):
+    """
+    Fetch `url` `repeat` times with `client`.
+
+    Returns:
+        tuple: (p50 ms, p95 ms, queries per request, response bytes)
+    """
+    p50, p95 = percentiles(time_calls(lambda: client.get(url, **extra), repeat))
+    # Counted after the timed requests, so one-off work of a first request is left out.
+    queries = QueryCounter()
+    with connection.execute_wrapper(queries):
+        response = client.get(url, **extra)
+    if response.status_code != 200:
+        raise RuntimeError(f'{url} returned {response.status_code}')
+    return p50, p95, queries.count, len(response.content)
+
+
+class UnsplashStubHandler(BaseHTTPRequestHandler):
+    """
+    Answers like the Unsplash search endpoint, with the server's `photos`, or
+    with the server's `status` when that is not 200, after waiting the
+    server's `delay` seconds.
+    """
+
+    def do_GET(self):
+        self.server.requests += 1
+        time.sleep(self.server.delay)
+        if self.server.status != 200:
+            self.send_error(self.server.status)
+            return
+        body = json.dumps({'results': [{'urls': {'regular': url}} for url in self.server.photos]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except ConnectionError:
+            # The server under test stopped while a refresh was waiting on us.
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_unsplash_stub(photos=(), delay=0):
+    """
+    Serve UnsplashStubHandler on a free local port from a daemon thread.
+    Call shutdown() and server_close() on the returned server when done.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), UnsplashStubHandler)
+    server.daemon_threads = True
+    server.requests = 0
+    server.status = 200
+    server.photos = list(photos)
+    server.delay = delay
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# gunicorn.conf.py environment for the WSGI and the ASGI application, as documented there.
+GUNICORN_SERVERS = (
+    ('WSGI gthread', {'GUNICORN_APP': 'SpaceSite_django.wsgi:application', 'GUNICORN_WORKER_CLASS': 'gthread'}),
+    ('ASGI uvicorn', {}),
+)
+
+
+@contextmanager
+def gunicorn_server(port, **env):
+    """
+    Run gunicorn with gunicorn.conf.py on 127.0.0.1:`port` until the block
+    exits. `env` overrides environment variables of the server, on top of
+    this process's own, so it uses the same settings module and database.
+
+    Yields:
+        str: Base URL of the server.
+    """
+    url = f'http://127.0.0.1:{port}'
+    server_env = {**os.environ, 'GUNICORN_BIND': f'127.0.0.1:{port}', **env}
+    with tempfile.TemporaryFile() as log:
+        process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+                                    '--access-logfile', os.devnull],
+                                   cwd=settings.BASE_DIR, env=server_env, stdout=log, stderr=log)
+        try:
+            deadline = time.monotonic() + 30
+            while True:
+                if process.poll() is not None:
+                    log.seek(0)
+                    raise RuntimeError(f'gunicorn exited with {process.returncode}:\n'
+                                       + log.read().decode(errors='replace'))
+                try:
+                    requests.get(url, timeout=10)
+                    break
+                except requests.RequestException:
+                    if time.monotonic() > deadline:
+                        raise RuntimeError('gunicorn did not start within 30 seconds')
+                    time.sleep(0.2)
+            yield url
+        finally:
+            process.terminate()
+            process.wait(30)
+
+
+def drive_load(url, concurrency, duration, **request_options):
+    """
+    GET `url` from `concurrency` client threads, each on its own keep-alive
+    session, for `duration` seconds.
+
+    Returns:
+        tuple: (requests per second, p50 ms, p95 ms, failed requests)
+    """
+    deadline = time.monotonic() + duration
+
+    def client():
+        samples, failures = [], 0
+        with requests.Session() as session:
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = session.get(url, timeout=60, **request_options)
+                    response.raise_for_status()
+                except requests.RequestException:
+                    failures += 1
+                    continue
+                samples.append((time.perf_counter() - started) * 1000)
+        return samples, failures
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(lambda _: client(), range(concurrency)))
+    elapsed = time.monotonic() - started
+    samples = [sample for thread_samples, _ in results for sample in thread_samples]
+    failures = sum(thread_failures for _, thread_failures in results)
+    if not samples:
+        raise RuntimeError(f'every request to {url} failed')
+    return (len(samples) / elapsed, *percentiles(samples), failures)
@@ -0,0 +1,93 @@
+# blacklist.py
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# Set once the cache holds every unexpired blacklisted refresh token.
+WARM_KEY = 'jwt_revoked:warm'
+WARM_LOCK_KEY = 'jwt_revoked:warming'
+WARM_LOCK_TIMEOUT = 300
+WARM_BATCH_SIZE = 2000
+
+token_cache = caches['tokens']
+# A per-process cache only sees the tokens blacklisted by its own process.
+TOKEN_CACHE_SHARED = not isinstance(token_cache, (LocMemCache, DummyCache))
+
+
+def _revoked_key(jti):
+    return f'jwt_revoked:{jti}'
+
+
+def revoke_token(jti, exp):
+    """
+    Mark the token `jti` as revoked until it expires on its own at `exp`.
+
+    Args:
+        jti (str): JWT ID claim of the token.
+        exp (int): Expiry claim of the token, as a Unix timestamp.
+    """
+    remaining = int(exp - time.time())
+    if remaining > 0:
+        token_cache.set(_revoked_key(jti), True, remaining)
+
+
+def is_token_revoked(jti):
+    return token_cache.get(_revoked_key(jti)) is not None
+
+
+def warm_blacklist_cache():
+    """
+    Copy every unexpired blacklisted refresh token from the database into the
+    cache, unless that was already done since the cache was last emptied.
+
+    Returns:
+        bool: True if the cache now holds the whole blacklist, False if another
+        process is still loading it.
+    """
+    if token_cache.get(WARM_KEY) is not None:
+        return True
+    if not token_cache.add(WARM_LOCK_KEY, True, WARM_LOCK_TIMEOUT):
+        return False
+    rows = (BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+            .order_by('token__expires_at').values_list('token__jti', 'token__expires_at'))
+    batch, batch_exp = {}, 0
+    for jti, expires_at in rows.iterator(chunk_size=WARM_BATCH_SIZE):
+        batch[_revoked_key(jti)] = True
+        batch_exp = expires_at.timestamp()
+        if len(batch) == WARM_BATCH_SIZE:
+            # Rows are sorted by expiry, so the last one's TTL covers the whole batch.
+            token_cache.set_many(batch, max(int(batch_exp - time.time()), 1))
+            batch = {}
+    if batch:
+        token_cache.set_many(batch, max(int(batch_exp - time.time()), 1))
+    token_cache.set(WARM_KEY, True, None)
+    token_cache.delete(WARM_LOCK_KEY)
+    return True
+
+
+class CachedRefreshToken(RefreshToken):
+    """
+    Refresh token whose blacklist is checked in the token cache.
+
+    Blacklisting still records the token in the database, which remains the
+    source the cache is warmed from after a restart or flush. Unless the token
+    cache is shared by all worker processes, the database is checked directly.
+    """
+
+    def check_blacklist(self):
+        if not TOKEN_CACHE_SHARED or not warm_blacklist_cache():
+            return super().check_blacklist()
+        if is_token_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError('Token is blacklisted')
+
+    def blacklist(self):
+        result = super().blacklist()
+        revoke_token(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+        return result
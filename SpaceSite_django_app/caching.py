@@ -0,0 +1,159 @@
+# caching.py
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .metrics import POST_FRAGMENT_LOOKUPS
+
+POST_FRAGMENT_HITS_KEY = 'post_fragment:hits'
+POST_FRAGMENT_MISSES_KEY = 'post_fragment:misses'
+FEED_GENERATION_KEY = 'feed:generation'
+
+
+def _incr(key, delta):
+    if not delta:
+        return
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # The counter does not exist yet (or was evicted).
+        if not cache.add(key, delta, None):
+            cache.incr(key, delta)
+
+
+def post_fragment_key(post_id):
+    # Bump the version whenever include/post_card.html changes, so cards
+    # rendered with the old markup are not served from a shared cache.
+    return f'post_card:v2:{post_id}'
+
+
+def _post_version(post):
+    return post.updated_at.isoformat()
+
+
+def render_post_fragments(posts):
+    """
+    Return the rendered card markup for each post, using the cache.
+
+    Fragments are stored per post id together with the post's `updated_at`,
+    so an entry that outlived its post version is treated as a miss. All
+    lookups for a page go to the cache in a single `get_many` round trip.
+
+    Args:
+        posts (Iterable[Post]): Posts with `user` already loaded.
+
+    Returns:
+        list[dict]: One {'post', 'card'} dict per post, in order.
+    """
+    posts = list(posts)
+    cached = cache.get_many([post_fragment_key(post.id) for post in posts])
+
+    fragments, missing = [], {}
+    for post in posts:
+        entry = cached.get(post_fragment_key(post.id))
+        if entry is None or entry['version'] != _post_version(post):
+            entry = {
+                'version': _post_version(post),
+                'card': render_to_string('include/post_card.html', {'post': post}),
+            }
+            missing[post_fragment_key(post.id)] = entry
+        fragments.append({'post': post, 'card': mark_safe(entry['card'])})
+
+    if missing:
+        cache.set_many(missing, settings.POST_FRAGMENT_TIMEOUT)
+    # Per process on /metrics; the cache counters add up all workers when the cache is shared.
+    POST_FRAGMENT_LOOKUPS.inc('hit', len(posts) - len(missing))
+    POST_FRAGMENT_LOOKUPS.inc('miss', len(missing))
+    _incr(POST_FRAGMENT_HITS_KEY, len(posts) - len(missing))
+    _incr(POST_FRAGMENT_MISSES_KEY, len(missing))
+    return fragments
+
+
+def invalidate_post_fragments(post_ids):
+    cache.delete_many([post_fragment_key(post_id) for post_id in post_ids])
+
+
+def post_fragment_stats():
+    """
+    Return the fragment cache hit/miss counters and the resulting hit ratio.
+    """
+    counters = cache.get_many([POST_FRAGMENT_HITS_KEY, POST_FRAGMENT_MISSES_KEY])
+    hits = counters.get(POST_FRAGMENT_HITS_KEY, 0)
+    misses = counters.get(POST_FRAGMENT_MISSES_KEY, 0)
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_ratio': hits / total if total else 0.0}
+
+
+def reset_post_fragment_stats():
+    cache.delete_many([POST_FRAGMENT_HITS_KEY, POST_FRAGMENT_MISSES_KEY])
+
+
+def feed_generation():
+    """
+    Return the current feed generation; bumping it orphans every cached feed page.
+    """
+    generation = cache.get(FEED_GENERATION_KEY)
+    if generation is None:
+        cache.add(FEED_GENERATION_KEY, 1, None)
+        generation = cache.get(FEED_GENERATION_KEY, 1)
+    return generation
+
+
+async def afeed_generation():
+    """
+    Async version of feed_generation().
+    """
+    generation = await cache.aget(FEED_GENERATION_KEY)
+    if generation is None:
+        await cache.aadd(FEED_GENERATION_KEY, 1, None)
+        generation = await cache.aget(FEED_GENERATION_KEY, 1)
+    return generation
+
+
+def bump_feed_generation():
+    _incr(FEED_GENERATION_KEY, 1)
+
+
+def feed_page_key(request, generation=None):
+    if generation is None:
+        generation = feed_generation()
+    position = f"{request.GET.get('page', '')}|{request.GET.get('cursor', '')}"
+    return f'feed_page:{generation}:{hashlib.md5(position.encode()).hexdigest()}'
+
+
+def get_cached_feed_page(request):
+    """
+    Return the cached anonymous feed response for this page, or None.
+    """
+    entry = cache.get(feed_page_key(request))
+    if entry is None:
+        return None
+    content, content_type = entry
+    return HttpResponse(content, content_type=content_type)
+
+
+async def aget_cached_feed_page(request):
+    """
+    Async version of get_cached_feed_page().
+    """
+    entry = await cache.aget(feed_page_key(request, await afeed_generation()))
+    if entry is None:
+        return None
+    content, content_type = entry
+    return HttpResponse(content, content_type=content_type)
+
+
+def cache_feed_page(request, response):
+    if response.status_code == 200:
+        cache.set(feed_page_key(request), (response.content, response['Content-Type']),
+                  settings.FEED_PAGE_CACHE_TIMEOUT)
+
+
+async def acache_feed_page(request, response):
+    if response.status_code == 200:
+        await cache.aset(feed_page_key(request, await afeed_generation()),
+                         (response.content, response['Content-Type']), settings.FEED_PAGE_CACHE_TIMEOUT)
@@ -0,0 +1,23 @@
+# checks.py
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+
+
+@register(Tags.caches)
+def check_feed_page_cache(app_configs, **kwargs):
+    """
+    The feed page cache is purged by bumping a generation counter in the
+    default cache, which only reaches the other workers if they share it.
+    """
+    if settings.FEED_PAGE_CACHE_TIMEOUT and isinstance(caches['default'], (LocMemCache, DummyCache)):
+        return [Error(
+            'FEED_PAGE_CACHE_TIMEOUT is set, but the default cache is local to each process.',
+            hint='Workers would keep serving their cached home page after a post is created or deleted '
+                 'in another one. Set CACHE_BACKEND to a shared cache such as Redis, or '
+                 'FEED_PAGE_CACHE_TIMEOUT=0.',
+            id='SpaceSite_django_app.E001',
+        )]
+    return []
@@ -0,0 +1,50 @@
+# counters.py
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Post, User
+
+
+def record_post_created(post):
+    """
+    Count a new post on its author.
+    """
+    last_post_at = Greatest(Coalesce('last_post_at', post.created_at), post.created_at)
+    User.objects.filter(pk=post.user_id).update(post_count=F('post_count') + 1, last_post_at=last_post_at)
+
+
+def record_post_deleted(user_id):
+    """
+    Count a deleted post off user `user_id` and recompute their last post date.
+    """
+    latest = Post.objects.filter(user_id=OuterRef('pk')).order_by('-created_at').values('created_at')[:1]
+    User.objects.filter(pk=user_id, post_count__gt=0).update(post_count=F('post_count') - 1,
+                                                              last_post_at=Subquery(latest))
+
+
+def recount_post_counters(batch_size=1000):
+    """
+    Recompute post_count and last_post_at of every user from the post table
+    with one grouped query, and write back only the users that drifted.
+
+    Returns:
+        int: Number of users corrected.
+    """
+    stats = {row['user_id']: (row['count'], row['last'])
+             for row in Post.objects.order_by().values('user_id').annotate(count=Count('id'), last=Max('created_at'))}
+
+    fixed = 0
+    drifted = []
+    for user in User.objects.only('id', *User.COUNTER_FIELDS).iterator(chunk_size=batch_size):
+        count, last = stats.get(user.id, (0, None))
+        if (user.post_count, user.last_post_at) != (count, last):
+            user.post_count, user.last_post_at = count, last
+            drifted.append(user)
+        if len(drifted) == batch_size:
+            User.objects.bulk_update(drifted, User.COUNTER_FIELDS)
+            fixed += len(drifted)
+            drifted = []
+    if drifted:
+        User.objects.bulk_update(drifted, User.COUNTER_FIELDS)
+        fixed += len(drifted)
+    return fixed
@@ -0,0 +1,82 @@
+# flash.py
+from django.conf import settings
+from django.core import signing
+from django.utils.module_loading import import_string
+
+TOP_MESSAGE_KEY = 'top_message'
+
+
+class SessionTopMessageStorage:
+    """
+    Keep the top message in the session (one session write per message).
+    """
+
+    def __init__(self, request):
+        self.request = request
+
+    def get(self):
+        return self.request.session.get(TOP_MESSAGE_KEY)
+
+    def pop(self):
+        return self.request.session.pop(TOP_MESSAGE_KEY, None)
+
+    def set(self, message):
+        self.request.session[TOP_MESSAGE_KEY] = message
+
+    def update(self, response):
+        pass
+
+
+class CookieTopMessageStorage:
+    """
+    Keep the top message in a short-lived signed cookie, so flashing a message
+    never touches the session or the database.
+    """
+    salt = 'SpaceSite_django_app.flash'
+
+    def __init__(self, request):
+        self.request = request
+        self.incoming = None
+        self.outgoing = None
+        self.consumed = False
+        value = request.COOKIES.get(TOP_MESSAGE_KEY)
+        if value:
+            try:
+                self.incoming = signing.loads(value, salt=self.salt, max_age=settings.TOP_MESSAGE_MAX_AGE)
+            except signing.BadSignature:
+                self.consumed = True
+
+    def get(self):
+        if self.outgoing is not None:
+            return self.outgoing
+        return None if self.consumed else self.incoming
+
+    def pop(self):
+        message = self.get()
+        self.outgoing = None
+        self.consumed = True
+        return message
+
+    def set(self, message):
+        self.outgoing = message
+
+    def update(self, response):
+        if self.outgoing is not None:
+            response.set_cookie(TOP_MESSAGE_KEY, signing.dumps(self.outgoing, salt=self.salt),
+                                max_age=settings.TOP_MESSAGE_MAX_AGE, httponly=True, samesite='Lax',
+                                secure=settings.SESSION_COOKIE_SECURE)
+        elif self.consumed and TOP_MESSAGE_KEY in self.request.COOKIES:
+            response.delete_cookie(TOP_MESSAGE_KEY, samesite='Lax')
+
+
+def get_top_message_storage(request):
+    """
+    Return the top message storage of `request`, creating it on first use.
+    """
+    # Attributes set on a DRF Request do not reach the HttpRequest the middleware sees.
+    request = getattr(request, '_request', request)
+    storage = getattr(request, '_top_message_storage', None)
+    if storage is None:
+        storage = import_string(settings.TOP_MESSAGE_STORAGE)(request)
+        request._top_message_storage = storage
+    return storage
@@ -1,4 +1,5 @@
 from django import forms
+from django.conf import settings
 from django.core.exceptions import ValidationError
 
 from .models import User, UserProfile
@@ -32,3 +33,10 @@ class UserProfileForm(forms.ModelForm):
         if age is not None and (age < 16 or age > 120):
             raise ValidationError("Age must be between 16 and 120.")
         return age
+
+    def clean_user_photo(self):
+        photo = self.cleaned_data.get('user_photo')
+        image = getattr(photo, 'image', None)
+        if image is not None and image.width * image.height > settings.AVATAR_MAX_PIXELS:
+            raise ValidationError("Image is too large, please upload a smaller photo.")
+        return photo
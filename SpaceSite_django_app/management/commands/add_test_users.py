@@ -1,15 +1,83 @@
+import io
+import random
+import time
+from datetime import datetime, timezone as dt_timezone
+
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
 
-from SpaceSite_django_app.models import UserProfile
+from SpaceSite_django_app.caching import bump_feed_generation
+from SpaceSite_django_app.models import Post, UserProfile
+from SpaceSite_django_app.search import index_posts
 
 User = get_user_model()
 
+WORDS = (
+    'galaxy', 'nebula', 'star', 'planet', 'orbit', 'comet', 'asteroid', 'telescope', 'rocket', 'launch',
+    'moon', 'mars', 'jupiter', 'saturn', 'venus', 'mercury', 'neptune', 'uranus', 'pluto', 'eclipse',
+    'cosmos', 'universe', 'gravity', 'light', 'year', 'dark', 'matter', 'energy', 'black', 'hole',
+    'supernova', 'pulsar', 'quasar', 'satellite', 'station', 'astronaut', 'mission', 'crew', 'module', 'lander',
+    'rover', 'crater', 'dust', 'storm', 'ring', 'belt', 'cloud', 'cluster', 'spiral', 'milky',
+    'way', 'andromeda', 'horizon', 'event', 'signal', 'radio', 'wave', 'infrared', 'spectrum', 'photon',
+    'the', 'a', 'of', 'and', 'to', 'in', 'is', 'we', 'saw', 'tonight',
+    'amazing', 'bright', 'distant', 'new', 'first', 'last', 'huge', 'tiny', 'cold', 'hot',
+)
+
+
+# Backslash escapes of COPY's text format.
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def insert_posts(rows):
+    """
+    Insert (id, user_id, content, created_at) rows into the post table with
+    COPY on PostgreSQL, or a single executemany() elsewhere.
+
+    bulk_create() spends most of its time preparing values field by field, and
+    it would stamp created_at with the current time. psycopg2's executemany()
+    sends one statement per row.
+    """
+    table = connection.ops.quote_name(Post._meta.db_table)
+    columns = ', '.join(connection.ops.quote_name(Post._meta.get_field(name).column)
+                        for name in ('id', 'user', 'content', 'created_at', 'updated_at'))
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            data = io.StringIO(''.join(
+                f'{pk}\t{user_id}\t{content.translate(COPY_ESCAPES)}\t{created_at.isoformat()}\t{created_at.isoformat()}\n'
+                for pk, user_id, content, created_at in rows))
+            cursor.cursor.copy_expert(f'COPY {table} ({columns}) FROM STDIN', data)
+        else:
+            adapt = connection.ops.adapt_datetimefield_value
+            cursor.executemany(f'INSERT INTO {table} ({columns}) VALUES (%s, %s, %s, %s, %s)',
+                               [(pk, user_id, content, adapt(created_at), adapt(created_at))
+                                for pk, user_id, content, created_at in rows])
+
 
 class Command(BaseCommand):
-    help = 'Add test users to the database'
+    help = 'Add test users to the database, and optionally bulk synthetic users with posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=0, help='Synthetic users to create')
+        parser.add_argument('--posts-per-user', type=int, default=0, help='Posts created for each synthetic user')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows inserted per bulk_create batch')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; the same seed yields the same data')
+        parser.add_argument('--prefix', default='loadtest', help='Username prefix of synthetic users')
+        parser.add_argument('--password', default='123', help='Password of every synthetic user')
+        parser.add_argument('--days', type=int, default=365, help='Posts are spread over this many past days')
+        parser.add_argument('--distinct-posts', type=int, default=20000,
+                            help='Size of the pool of generated post texts')
 
-    def handle(self, *args, **kwargs):
+    def handle(self, *args, **options):
+        self.create_default_users()
+        if options['users']:
+            self.create_synthetic_data(options)
+
+    def create_default_users(self):
         # Create test user
         user, created = User.objects.get_or_create(
             username='user',
@@ -33,3 +101,58 @@ class Command(BaseCommand):
             admin.save()
             UserProfile.objects.create(user=admin)
             self.stdout.write(self.style.SUCCESS('Successfully created test admin'))
+
+    def create_synthetic_data(self, options):
+        started = time.perf_counter()
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        posts_per_user = options['posts_per_user']
+        prefix = options['prefix']
+        now = timezone.now().timestamp()
+        span = options['days'] * 86400
+
+        # Hashing is deliberately slow; every synthetic user shares one hash.
+        password = make_password(options['password'])
+        # Drawing from a pool of texts is much faster than building every post from words.
+        texts = [' '.join(rng.choices(WORDS, k=rng.randint(8, 60))) for _ in range(options['distinct_posts'])]
+        # Continue numbering after an earlier run with the same prefix.
+        first = User.objects.filter(username__startswith=prefix).count()
+        next_post_id = (Post.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+
+        users_created = posts_created = 0
+        for start in range(first, first + options['users'], batch_size):
+            stop = min(start + batch_size, first + options['users'])
+            users, post_dates = [], []
+            for number in range(start, stop):
+                dates = sorted(datetime.fromtimestamp(now - rng.random() * span, dt_timezone.utc)
+                               for _ in range(posts_per_user))
+                post_dates.append(dates)
+                users.append(User(username=f'{prefix}{number}', email=f'{prefix}{number}@example.com',
+                                  password=password, date_joined=datetime.fromtimestamp(now - span, dt_timezone.utc),
+                                  post_count=len(dates), last_post_at=dates[-1] if dates else None))
+
+            with transaction.atomic():
+                users = User.objects.bulk_create(users, batch_size=batch_size)
+                UserProfile.objects.bulk_create([UserProfile(user=user) for user in users], batch_size=batch_size)
+                posts = []
+                for user, dates in zip(users, post_dates):
+                    for created_at in dates:
+                        posts.append((next_post_id, user.id, rng.choice(texts), created_at))
+                        next_post_id += 1
+                for offset in range(0, len(posts), batch_size):
+                    batch = posts[offset:offset + batch_size]
+                    insert_posts(batch)
+                    # Nothing above sends signals, so index the batch here.
+                    index_posts((pk, content) for pk, _, content, _ in batch)
+
+            users_created += len(users)
+            posts_created += len(posts)
+            self.stdout.write(f'{users_created} users, {posts_created} posts')
+
+        # Ids were assigned here, so move the id sequence past them (as loaddata does).
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [Post]):
+                cursor.execute(sql)
+        bump_feed_generation()
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {users_created} users and {posts_created} posts in {time.perf_counter() - started:.1f}s'))
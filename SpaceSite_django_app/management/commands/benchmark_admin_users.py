@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.urls import reverse
+
+from SpaceSite_django_app.benchmarking import logged_in_client, time_page, write_table
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Time the admin user list: first and deep pages, prefix search and role filter'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help='Timed requests per page')
+        parser.add_argument('--admin-username', default='admin', help='Account used for the admin pages')
+        parser.add_argument('--search', default='loadtest12', help='Username or email prefix to search for')
+
+    def handle(self, *args, **options):
+        try:
+            admin = User.objects.get(username=options['admin_username'])
+        except User.DoesNotExist:
+            raise CommandError('Admin account not found, run add_test_users first')
+        total = User.objects.count()
+        url = reverse('admin_user_list')
+        deep_page = max(total // 50 // 2, 1)
+        search = options['search']
+        targets = [
+            ('first page', url),
+            (f'page {deep_page}', f'{url}?page={deep_page}'),
+            (f'q={search}', f'{url}?q={search}'),
+            ('role=admin page 20', f'{url}?role=admin&page=20'),
+            (f'q={search} role=user', f'{url}?q={search}&role=user'),
+            ('sort=posts', f'{url}?sort=posts'),
+        ]
+
+        rows = []
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            client = logged_in_client(admin)
+            for label, target in targets:
+                p50, p95, queries, size = time_page(client, target, options['repeat'])
+                rows.append([label, f'{p50:.1f}', f'{p95:.1f}', queries, size])
+
+        self.stdout.write(f'{total} users, {options["repeat"]} requests per page')
+        write_table(self.stdout, ['page', 'p50 ms', 'p95 ms', 'queries', 'bytes'], rows)
@@ -0,0 +1,60 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from SpaceSite_django_app.api import PostFeedAPIView
+from SpaceSite_django_app.authentication import StatelessJWTAuthentication, token_for_user
+from SpaceSite_django_app.benchmarking import QueryCounter, write_table
+
+User = get_user_model()
+
+# API_AUTH_MODE values and the authentication class each selects.
+MODES = (
+    ('db', JWTAuthentication),
+    ('stateless', StatelessJWTAuthentication),
+)
+
+
+class Command(BaseCommand):
+    help = ('Requests per second of an authenticated API call, with the user loaded from the '
+            'database and with the user built from the token claims')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per mode')
+        parser.add_argument('--username', default='user', help='Account the access token is issued for')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError('Test account not found, run add_test_users first')
+        authorization = f'Bearer {token_for_user(user).access_token}'
+        url = f"{reverse('api_posts')}?limit=1"
+
+        rows = []
+        for mode, authentication_class in MODES:
+            # DRF reads DEFAULT_AUTHENTICATION_CLASSES when the view class is created.
+            with override_settings(ALLOWED_HOSTS=['testserver']), \
+                    mock.patch.object(PostFeedAPIView, 'authentication_classes', [authentication_class]):
+                client = Client(HTTP_AUTHORIZATION=authorization)
+                response = client.get(url)
+                if response.status_code != 200:
+                    raise CommandError(f'{mode}: {url} returned {response.status_code}')
+                queries = QueryCounter()
+                with connection.execute_wrapper(queries):
+                    client.get(url)
+                started = time.perf_counter()
+                for _ in range(options['requests']):
+                    client.get(url)
+                elapsed = time.perf_counter() - started
+            rows.append([mode, queries.count, f'{options["requests"] / elapsed:.0f}',
+                         f'{elapsed / options["requests"] * 1000:.2f}'])
+
+        self.stdout.write(f'GET {url} with a bearer token, {options["requests"]} requests per mode, one thread')
+        write_table(self.stdout, ['API_AUTH_MODE', 'queries', 'req/s', 'ms/request'], rows)
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from SpaceSite_django_app.benchmarking import (GUNICORN_SERVERS, drive_load, gunicorn_server, start_unsplash_stub,
+                                               write_table)
+
+
+class Command(BaseCommand):
+    help = ('Throughput and latency of concurrent home page requests under the WSGI and the ASGI '
+            'server, with Unsplash replaced by a deliberately slow local stub')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=32, help='Concurrent clients')
+        parser.add_argument('--duration', type=float, default=10, help='Seconds of load per server')
+        parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+        parser.add_argument('--threads', type=int, default=4, help='Threads per WSGI worker')
+        parser.add_argument('--stub-delay', type=float, default=2, help='Seconds the Unsplash stub takes to answer')
+        parser.add_argument('--port', type=int, default=8765, help='Local port for gunicorn')
+        parser.add_argument('--path', default='/', help='Page to request')
+
+    def handle(self, *args, **options):
+        stub = start_unsplash_stub([f'https://images.example.com/{number}.jpg' for number in range(50)],
+                                   delay=options['stub_delay'])
+        environment = {
+            'GUNICORN_WORKERS': str(options['workers']),
+            'GUNICORN_THREADS': str(options['threads']),
+            'UNSPLASH_API_URL': f'http://127.0.0.1:{stub.server_port}/search/photos',
+            'UNSPLASH_ACCESS_KEY': 'benchmark',
+            # Keep the stub busy: the photo pool goes stale every second.
+            'UNSPLASH_POOL_TTL': '1',
+            'UNSPLASH_RETRY_DELAY': '1',
+        }
+        rows = []
+        try:
+            for label, server_environment in GUNICORN_SERVERS:
+                stub.requests = 0
+                try:
+                    with gunicorn_server(options['port'], **environment, **server_environment) as url:
+                        per_second, p50, p95, failures = drive_load(url + options['path'], options['concurrency'],
+                                                                    options['duration'])
+                except RuntimeError as error:
+                    raise CommandError(f'{label}: {error}')
+                rows.append([label, f'{per_second:.0f}', f'{p50:.1f}', f'{p95:.1f}', failures, stub.requests])
+        finally:
+            stub.shutdown()
+            stub.server_close()
+
+        self.stdout.write(f'GET {options["path"]} from {options["concurrency"]} clients for {options["duration"]:g} s, '
+                          f'{options["workers"]} workers, Unsplash stub answering in {options["stub_delay"]:g} s')
+        write_table(self.stdout, ['server', 'req/s', 'p50 ms', 'p95 ms', 'failed', 'Unsplash calls'], rows)
@@ -0,0 +1,76 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.urls import reverse
+from django.utils.text import compress_string
+
+from SpaceSite_django_app.benchmarking import logged_in_client, write_table
+from SpaceSite_django_app.middleware import GZIP_MAX_RANDOM_BYTES, brotli
+
+User = get_user_model()
+
+
+def cpu_ms(func, repeat):
+    """
+    Return the mean CPU time of `func()` over `repeat` calls, in milliseconds.
+    """
+    started = time.process_time()
+    for _ in range(repeat):
+        func()
+    return (time.process_time() - started) / repeat * 1000
+
+
+class Command(BaseCommand):
+    help = ('Bytes on the wire and CPU time per response of gzip and brotli compression, '
+            'for the main HTML and JSON pages')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=50, help='Compressions timed per page and encoding')
+        parser.add_argument('--username', default='user', help='Account for the logged in pages')
+        parser.add_argument('--admin-username', default='admin', help='Account for the admin pages')
+
+    def handle(self, *args, **options):
+        if brotli is None:
+            raise CommandError('The brotli package is not installed')
+        try:
+            user = User.objects.get(username=options['username'])
+            admin = User.objects.get(username=options['admin_username'])
+        except User.DoesNotExist:
+            raise CommandError('Test accounts not found, run add_test_users first')
+
+        anonymous, user_client, admin_client = logged_in_client(), logged_in_client(user), logged_in_client(admin)
+        pages = (
+            ('home', anonymous, reverse('root')),
+            ('home, logged in', user_client, reverse('root')),
+            ('my posts', user_client, reverse('my_posts')),
+            ('admin user list', admin_client, reverse('admin_user_list')),
+            ('API feed, 100 posts', anonymous, reverse('api_posts') + '?limit=100'),
+        )
+        repeat = options['repeat']
+        quality = settings.COMPRESSION_BROTLI_QUALITY
+        rows = []
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            for label, client, url in pages:
+                body = client.get(url, HTTP_ACCEPT_ENCODING='identity')
+                if body.status_code != 200:
+                    raise CommandError(f'{url} returned {body.status_code}')
+                content = body.content
+                # What CompressionMiddleware picks for a browser, which accepts both.
+                sent = client.get(url, HTTP_ACCEPT_ENCODING='br, gzip').get('Content-Encoding', 'identity')
+
+                def gzip():
+                    return compress_string(content, max_random_bytes=GZIP_MAX_RANDOM_BYTES)
+
+                def br():
+                    return brotli.compress(content, mode=brotli.MODE_TEXT, quality=quality)
+
+                rows.append([label, len(content), len(gzip()), len(br()), sent,
+                             f'{cpu_ms(gzip, repeat):.2f}', f'{cpu_ms(br, repeat):.2f}'])
+
+        self.stdout.write(f'gzip level 6 with up to {GZIP_MAX_RANDOM_BYTES} bytes of padding, brotli quality '
+                          f'{quality}; CPU time is the mean of {repeat} compressions')
+        write_table(self.stdout, ['page', 'identity B', 'gzip B', 'br B', 'sent', 'gzip CPU ms', 'br CPU ms'],
+                    rows)
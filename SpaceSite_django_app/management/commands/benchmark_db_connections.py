@@ -0,0 +1,85 @@
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from SpaceSite_django_app.benchmarking import GUNICORN_SERVERS, drive_load, gunicorn_server, write_table
+
+# POSTGRES_* environment of each way of handling connections.
+CONNECTION_MODES = (
+    ('new per request', {'POSTGRES_POOL': 'False', 'POSTGRES_CONN_MAX_AGE': '0'}),
+    ('persistent', {'POSTGRES_POOL': 'False', 'POSTGRES_CONN_MAX_AGE': '60'}),
+    ('pool', {'POSTGRES_POOL': 'True'}),
+)
+
+
+class BackendCounter:
+    """
+    Track the most PostgreSQL backends connected to the current database,
+    polling pg_stat_activity from a thread of its own.
+    """
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._poll, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _poll(self):
+        try:
+            with connections['default'].cursor() as cursor:
+                while not self._stop.is_set():
+                    cursor.execute('SELECT count(*) FROM pg_stat_activity '
+                                   'WHERE datname = current_database() AND pid <> pg_backend_pid()')
+                    self.peak = max(self.peak, cursor.fetchone()[0])
+                    self._stop.wait(self.interval)
+        finally:
+            connections['default'].close()
+
+
+class Command(BaseCommand):
+    help = ('Latency, throughput and open PostgreSQL connections of /api/posts/ under gunicorn, '
+            'with a new connection per request, persistent connections and the connection pool')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=32, help='Concurrent clients for the throughput run')
+        parser.add_argument('--duration', type=float, default=5, help='Seconds of load per run')
+        parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+        parser.add_argument('--threads', type=int, default=4, help='Threads per WSGI worker')
+        parser.add_argument('--port', type=int, default=8765, help='Local port for gunicorn')
+        parser.add_argument('--path', default='/api/posts/?limit=12', help='Page to request')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Connection handling only differs on PostgreSQL; set the POSTGRES_* variables')
+
+        environment = {'GUNICORN_WORKERS': str(options['workers']), 'GUNICORN_THREADS': str(options['threads'])}
+        rows = []
+        for server, server_environment in GUNICORN_SERVERS:
+            for mode, mode_environment in CONNECTION_MODES:
+                try:
+                    with gunicorn_server(options['port'], **environment, **server_environment,
+                                         **mode_environment) as url:
+                        url += options['path']
+                        # One client shows the cost of a request on its own, including connecting.
+                        _, p50, _, _ = drive_load(url, 1, options['duration'])
+                        with BackendCounter() as backends:
+                            per_second, _, p95, failures = drive_load(url, options['concurrency'],
+                                                                      options['duration'])
+                except RuntimeError as error:
+                    raise CommandError(f'{server}, {mode}: {error}')
+                rows.append([server, mode, f'{p50:.2f}', f'{per_second:.0f}', f'{p95:.1f}', failures,
+                             backends.peak])
+
+        self.stdout.write(f'GET {options["path"]}, {options["workers"]} workers; one client, then '
+                          f'{options["concurrency"]} clients, for {options["duration"]:g} s each')
+        write_table(self.stdout, ['server', 'connections', '1 client p50 ms', 'req/s', 'p95 ms', 'failed',
+                                  'peak backends'], rows)
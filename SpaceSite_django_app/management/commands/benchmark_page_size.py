@@ -0,0 +1,56 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils.html import escape
+
+from SpaceSite_django_app.benchmarking import write_table
+from SpaceSite_django_app.management.commands.add_test_users import WORDS
+from SpaceSite_django_app.models import Post
+
+User = get_user_model()
+
+ENCODINGS = ('identity', 'gzip', 'br')
+
+
+class Command(BaseCommand):
+    help = ('Bytes of the home page with long synthetic posts on it, against the full post bodies '
+            'it no longer embeds. The posts are rolled back afterwards.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=12, help='Long posts to add, one home page worth')
+        parser.add_argument('--length', type=int, default=4500, help='Characters per post')
+        parser.add_argument('--username', default='user', help='Author of the posts')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError('Test account not found, run add_test_users first')
+
+        rng = random.Random(0)
+        client = Client()
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=['testserver']):
+            posts = []
+            for _ in range(options['posts']):
+                content = ' '.join(rng.choices(WORDS, k=options['length'] // 5))[:options['length']]
+                posts.append(Post.objects.create(user=user, content=content))
+
+            rows = []
+            for encoding in ENCODINGS:
+                home = client.get(reverse('root'), HTTP_ACCEPT_ENCODING=encoding)
+                detail = client.get(reverse('post_detail', args=[posts[0].id]), HTTP_ACCEPT_ENCODING=encoding)
+                if home.status_code != 200 or detail.status_code != 200:
+                    raise CommandError(f'{encoding}: status {home.status_code} and {detail.status_code}')
+                rows.append([encoding, home.get('Content-Encoding', 'identity'), len(home.content),
+                             len(detail.content)])
+            # What the removed modals added to every home page: each body, escaped, at least once.
+            embedded = sum(len(escape(post.content)) for post in posts)
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'{options["posts"]} posts of {options["length"]} characters on the home page; '
+                          f'their full bodies are {embedded} bytes')
+        write_table(self.stdout, ['accepted', 'sent', 'home page bytes', 'one post detail bytes'], rows)
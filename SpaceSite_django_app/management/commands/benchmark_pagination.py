@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from SpaceSite_django_app.benchmarking import percentiles, time_calls, write_table
+from SpaceSite_django_app.models import Post
+from SpaceSite_django_app.pagination import encode_cursor, paginate_by_cursor
+from SpaceSite_django_app.views import legacy_page
+
+
+class Command(BaseCommand):
+    help = ('Time home feed pages near the start, middle and end of the posts table, '
+            'with cursor pagination and with the legacy OFFSET paginator')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=10, help='Timed fetches per page')
+        parser.add_argument('--per-page', type=int, default=12, help='Posts per page, as on the home page')
+        parser.add_argument('--from-end', type=int, default=50, help='Rows before the end for the deepest page')
+
+    def handle(self, *args, **options):
+        per_page = options['per_page']
+        feed = Post.objects.select_related('user').with_preview().order_by('-created_at', '-id')
+        total = Post.objects.count()
+        if total < per_page * 3:
+            raise CommandError('Not enough posts, create some with add_test_users --users --posts-per-user')
+
+        rows = []
+        for label, offset in (('first', 0), ('middle', total // 2),
+                              ('end', max(total - options['from_end'], 0))):
+            # The cursor of a page points at the row just before it.
+            cursor = None
+            if offset:
+                created_at, pk = feed.values_list('created_at', 'id')[offset - 1]
+                cursor = encode_cursor(created_at, pk)
+            page_number = offset // per_page + 1
+
+            cursor_ms = time_calls(lambda: list(paginate_by_cursor(feed, cursor, per_page)), options['repeat'])
+            offset_ms = time_calls(lambda: legacy_page(feed, page_number, per_page), options['repeat'])
+            rows.append([label, offset, *(f'{value:.2f}' for value in percentiles(cursor_ms)),
+                         *(f'{value:.2f}' for value in percentiles(offset_ms))])
+
+        self.stdout.write(f'{total} posts, {per_page} per page, {options["repeat"]} fetches per page')
+        write_table(self.stdout, ['page', 'offset', 'cursor p50 ms', 'cursor p95 ms',
+                                  'offset p50 ms', 'offset p95 ms'], rows)
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from SpaceSite_django_app.benchmarking import percentiles, time_calls, write_table
+from SpaceSite_django_app.models import Post
+from SpaceSite_django_app.search import _search_fallback, search_posts
+
+# Words add_test_users draws its posts from: one in every post or so, a
+# combination few posts have, and a word none of them contain.
+QUERIES = (
+    ('common', 'galaxy'),
+    ('rare', 'andromeda pulsar eclipse lander rover'),
+    ('missing', 'wormhole'),
+)
+
+
+class Command(BaseCommand):
+    help = ('Time a page of search results with the full-text index and with the icontains '
+            'scan used on other databases')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Timed searches per query and method')
+        parser.add_argument('--limit', type=int, default=20, help='Results per page')
+        parser.add_argument('--query', action='append', metavar='LABEL=WORDS',
+                            help='Search for WORDS instead of the default queries; may be repeated')
+
+    def handle(self, *args, **options):
+        queries = QUERIES
+        if options['query']:
+            queries = [query.split('=', 1) for query in options['query']]
+            if any(len(query) != 2 for query in queries):
+                raise CommandError('--query takes LABEL=WORDS')
+        total = Post.objects.count()
+        if not total:
+            raise CommandError('No posts, create some with add_test_users --users --posts-per-user')
+
+        limit = options['limit']
+        rows = []
+        for label, query in queries:
+            hits = len(search_posts(query, limit))
+            index_ms = time_calls(lambda: search_posts(query, limit), options['repeat'])
+            scan_ms = time_calls(lambda: _search_fallback(query, limit, 0), options['repeat'])
+            rows.append([label, query, hits, *(f'{value:.2f}' for value in percentiles(index_ms)),
+                         *(f'{value:.2f}' for value in percentiles(scan_ms))])
+
+        self.stdout.write(f'{total} posts on {connection.vendor}, {limit} results per page, '
+                          f'{options["repeat"]} searches per query')
+        write_table(self.stdout, ['query', 'words', 'hits', 'index p50 ms', 'index p95 ms',
+                                  'scan p50 ms', 'scan p95 ms'], rows)
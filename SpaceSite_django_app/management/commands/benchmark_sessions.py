@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from SpaceSite_django_app.benchmarking import write_table
+from SpaceSite_django_app.models import Post
+
+User = get_user_model()
+
+# (session engine, top message storage) pairs compared by default.
+SETUPS = (
+    ('django.contrib.sessions.backends.db', 'SpaceSite_django_app.flash.SessionTopMessageStorage'),
+    ('django.contrib.sessions.backends.cached_db', 'SpaceSite_django_app.flash.CookieTopMessageStorage'),
+    ('django.contrib.sessions.backends.signed_cookies', 'SpaceSite_django_app.flash.CookieTopMessageStorage'),
+)
+
+
+class SessionQueryCounter:
+    """
+    Count reads and writes of the session table, for connection.execute_wrapper().
+    """
+
+    def __init__(self):
+        self.reads = self.writes = 0
+        self.table = connection.ops.quote_name(Session._meta.db_table)
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.table in sql:
+            if sql.lstrip().upper().startswith('SELECT'):
+                self.reads += 1
+            else:
+                self.writes += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = ('Count session table reads and writes for a login followed by rounds of '
+            'create, edit and delete post, per session engine and top message storage')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=5, help='Create/edit/delete rounds after the login')
+        parser.add_argument('--username', default='user', help='Account used for the flow')
+        parser.add_argument('--password', default='123', help='Password of the account')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError('Test account not found, run add_test_users first')
+
+        rows = []
+        for engine, storage in SETUPS:
+            with override_settings(SESSION_ENGINE=engine, TOP_MESSAGE_STORAGE=storage,
+                                   ALLOWED_HOSTS=['testserver']):
+                counter = SessionQueryCounter()
+                with connection.execute_wrapper(counter):
+                    self.run_flow(Client(), user, options)
+            rows.append([engine.rsplit('.', 1)[1], storage.rsplit('.', 1)[1], counter.writes, counter.reads])
+
+        self.stdout.write(f'Login + {options["rounds"]} rounds of create, edit and delete (each followed by '
+                          f'the page it redirects to)')
+        write_table(self.stdout, ['session engine', 'top messages', 'session writes', 'session reads'], rows)
+
+    def run_flow(self, client, user, options):
+        response = client.post(reverse('login'), {'username': user.username, 'password': options['password']},
+                               follow=True)
+        if not response.redirect_chain or response.redirect_chain[0][0] != reverse('root'):
+            raise CommandError('Login failed, check --username and --password')
+        for number in range(options['rounds']):
+            client.post(reverse('create_post'), {'content': f'Benchmark post {number}'}, follow=True)
+            post = Post.objects.filter(user=user).only('id').latest('created_at', 'id')
+            client.post(reverse('edit_post', args=[post.id]), {'content': f'Benchmark post {number}, edited'},
+                        follow=True)
+            client.post(reverse('delete_post', args=[post.id]), follow=True)
@@ -0,0 +1,100 @@
+import time
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from SpaceSite_django_app import blacklist
+from SpaceSite_django_app.authentication import MyTokenRefreshSerializer, token_for_user
+from SpaceSite_django_app.benchmarking import QueryCounter, percentiles, time_calls, write_table
+
+User = get_user_model()
+
+SEED_BATCH_SIZE = 2000
+
+# Blacklist lookup, token class and refresh serializer of each mode.
+MODES = (
+    ('database', RefreshToken, TokenRefreshSerializer),
+    ('cache', blacklist.CachedRefreshToken, MyTokenRefreshSerializer),
+)
+
+
+class Command(BaseCommand):
+    help = ('Time refresh token verification and rotation with the blacklist checked in the '
+            'database and in the token cache. Everything is rolled back afterwards.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=100_000,
+                            help='Synthetic outstanding tokens to add first: 90%% expired, half blacklisted')
+        parser.add_argument('--repeat', type=int, default=1000, help='Timed verifications per mode')
+        parser.add_argument('--refreshes', type=int, default=200, help='Timed refreshes per mode')
+        parser.add_argument('--username', default='user', help='Account the tokens are issued for')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError('Test account not found, run add_test_users first')
+
+        with transaction.atomic():
+            self.seed(user, options['seed'])
+            blacklisted = BlacklistedToken.objects.count()
+            # The cache lookup is what a shared token cache gives every worker; force it here
+            # so the numbers do not depend on the configured backend.
+            with mock.patch.object(blacklist, 'TOKEN_CACHE_SHARED', True):
+                blacklist.token_cache.delete(blacklist.WARM_KEY)
+                started = time.perf_counter()
+                blacklist.warm_blacklist_cache()
+                warm_ms = (time.perf_counter() - started) * 1000
+                rows = [self.measure(user, options, *mode) for mode in MODES]
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'{blacklisted} blacklisted tokens, cache warmed in {warm_ms:.0f} ms; '
+                          f'{options["repeat"]} verifications and {options["refreshes"]} refreshes per mode')
+        write_table(self.stdout, ['blacklist', 'verify queries', 'verify p50 ms', 'verify p95 ms',
+                                  'refresh queries', 'refresh p50 ms', 'refresh p95 ms'], rows)
+
+    def seed(self, user, count):
+        now = timezone.now()
+        for start in range(0, count, SEED_BATCH_SIZE):
+            tokens = []
+            for number in range(start, min(start + SEED_BATCH_SIZE, count)):
+                expired = number % 10 != 0
+                expires_at = now + (-timedelta(days=1 + number % 30) if expired else timedelta(hours=12))
+                tokens.append(OutstandingToken(user=user, jti=uuid.uuid4().hex, token='',
+                                               created_at=expires_at - timedelta(days=1), expires_at=expires_at))
+            OutstandingToken.objects.bulk_create(tokens)
+            BlacklistedToken.objects.bulk_create(
+                BlacklistedToken(token_id=pk)
+                for pk in OutstandingToken.objects.filter(jti__in=[token.jti for token in tokens[::2]])
+                .values_list('id', flat=True)
+            )
+
+    def measure(self, user, options, mode, token_class, serializer_class):
+        raw_token = str(token_for_user(user))
+        verify_ms = time_calls(lambda: token_class(raw_token), options['repeat'])
+        verify_queries = QueryCounter()
+        with connection.execute_wrapper(verify_queries):
+            token_class(raw_token)
+
+        # Rotation blacklists the token it is given, so every refresh needs a fresh one.
+        fresh_tokens = iter([str(token_for_user(user)) for _ in range(options['refreshes'] + 2)])
+
+        def refresh():
+            serializer = serializer_class(data={'refresh': next(fresh_tokens)})
+            if not serializer.is_valid():
+                raise CommandError(f'{mode}: refresh failed: {serializer.errors}')
+
+        refresh_ms = time_calls(refresh, options['refreshes'])
+        refresh_queries = QueryCounter()
+        with connection.execute_wrapper(refresh_queries):
+            refresh()
+        return [mode, verify_queries.count, *(f'{value:.3f}' for value in percentiles(verify_ms)),
+                refresh_queries.count, *(f'{value:.3f}' for value in percentiles(refresh_ms))]
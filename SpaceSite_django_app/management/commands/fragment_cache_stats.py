@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from SpaceSite_django_app.caching import post_fragment_stats, reset_post_fragment_stats
+
+
+class Command(BaseCommand):
+    help = 'Show hit/miss counters of the rendered post fragment cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after printing them')
+
+    def handle(self, *args, **options):
+        if not settings.CACHE_SHARED:
+            # This command would only see the counters of its own process.
+            raise CommandError(f'{settings.CACHE_BACKEND} is not shared between processes; set a shared '
+                               'CACHE_BACKEND, or read spacesite_post_fragment_cache_lookups_total on /metrics/')
+        stats = post_fragment_stats()
+        self.stdout.write(f"hits: {stats['hits']}")
+        self.stdout.write(f"misses: {stats['misses']}")
+        self.stdout.write(f"hit ratio: {stats['hit_ratio']:.2%}")
+        if options['reset']:
+            reset_post_fragment_stats()
+            self.stdout.write(self.style.SUCCESS('Counters reset'))
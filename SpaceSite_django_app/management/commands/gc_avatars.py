@@ -0,0 +1,54 @@
+import posixpath
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from SpaceSite_django_app.avatars import thumbnail_name
+from SpaceSite_django_app.models import UserProfile
+from SpaceSite_django_app.storage import avatar_storage
+
+
+def walk(storage, path):
+    directories, files = storage.listdir(path)
+    for file_name in files:
+        yield posixpath.join(path, file_name)
+    for directory in directories:
+        yield from walk(storage, posixpath.join(path, directory))
+
+
+class Command(BaseCommand):
+    help = 'Delete avatar files and thumbnails no longer referenced by any profile'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-minutes', type=int, default=60,
+                            help='Keep unreferenced files younger than this (uploads still in flight)')
+        parser.add_argument('--dry-run', action='store_true', help='Only list the files that would be deleted')
+
+    def handle(self, *args, **options):
+        if not avatar_storage.exists('avatars'):
+            self.stdout.write('No avatars directory, nothing to do')
+            return
+
+        referenced = set()
+        profiles = (UserProfile.objects.exclude(user_photo='').exclude(user_photo__isnull=True)
+                    .values_list('user_photo', 'avatar_hash'))
+        for name, avatar_hash in profiles.iterator(chunk_size=2000):
+            referenced.add(name)
+            if avatar_hash:
+                referenced.update(thumbnail_name(avatar_hash, size) for size in settings.AVATAR_THUMBNAIL_SIZES)
+
+        cutoff = timezone.now() - timedelta(minutes=options['grace_minutes'])
+        deleted = 0
+        for name in walk(avatar_storage, 'avatars'):
+            if name in referenced or avatar_storage.get_modified_time(name) > cutoff:
+                continue
+            if options['dry_run']:
+                self.stdout.write(name)
+            else:
+                avatar_storage.delete(name)
+            deleted += 1
+
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {deleted} unreferenced avatar files'))
@@ -0,0 +1,95 @@
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Drive the main pages of a running server and report latency percentiles per page'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='Server to test')
+        parser.add_argument('--requests', type=int, default=200, help='Requests sent to every page')
+        parser.add_argument('--concurrency', type=int, default=8, help='Parallel clients')
+        parser.add_argument('--username', default='user', help='Account used for the logged-in pages')
+        parser.add_argument('--admin-username', default='admin', help='Account used for the admin pages')
+        parser.add_argument('--password', default='123', help='Password of both accounts')
+        parser.add_argument('--search', default='galaxy', help='Search query')
+
+    def handle(self, *args, **options):
+        base_url = options['base_url'].rstrip('/')
+        try:
+            user = User.objects.only('id').get(username=options['username'])
+            admin = User.objects.only('id').get(username=options['admin_username'])
+        except User.DoesNotExist:
+            raise CommandError('Test accounts not found, run add_test_users first')
+
+        # (name, account, path); account None means anonymous.
+        targets = [
+            ('root', None, reverse('root')),
+            ('root_logged_in', 'user', reverse('root')),
+            ('search', None, f"{reverse('search')}?q={options['search']}"),
+            ('api_posts', None, reverse('api_posts')),
+            ('login', None, reverse('login')),
+            ('profile', 'user', reverse('profile', args=[user.id])),
+            ('my_posts', 'user', reverse('my_posts')),
+            ('admin_user_list', 'admin', reverse('admin_user_list')),
+            ('admin_user_list_by_posts', 'admin', f"{reverse('admin_user_list')}?sort=posts"),
+            ('admin_user_posts', 'admin', reverse('admin_user_posts', args=[user.id])),
+        ]
+        accounts = {'user': options['username'], 'admin': options['admin_username']}
+        local = threading.local()
+
+        def session_for(account):
+            # One HTTP session per client thread and account, logged in once.
+            sessions = getattr(local, 'sessions', None)
+            if sessions is None:
+                sessions = local.sessions = {}
+            if account not in sessions:
+                session = requests.Session()
+                if account is not None:
+                    session.post(f"{base_url}{reverse('login')}", allow_redirects=False,
+                                 data={'username': accounts[account], 'password': options['password']})
+                sessions[account] = session
+            return sessions[account]
+
+        def fetch(target):
+            name, account, path = target
+            session = session_for(account)
+            started = time.perf_counter()
+            try:
+                response = session.get(f'{base_url}{path}', allow_redirects=False, timeout=30)
+                ok = response.status_code == 200
+            except requests.RequestException:
+                ok = False
+            return name, time.perf_counter() - started, ok
+
+        jobs = [target for _ in range(options['requests']) for target in targets]
+        timings = defaultdict(list)
+        errors = defaultdict(int)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            for name, elapsed, ok in executor.map(fetch, jobs):
+                timings[name].append(elapsed * 1000)
+                if not ok:
+                    errors[name] += 1
+        total = time.perf_counter() - started
+
+        self.stdout.write(f"{'page':<26}{'requests':>9}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+        for name, _, _ in targets:
+            samples = timings[name]
+            if len(samples) > 1:
+                cuts = statistics.quantiles(samples, n=100, method='inclusive')
+                p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+            else:
+                p50 = p95 = p99 = samples[0]
+            self.stdout.write(f'{name:<26}{len(samples):>9}{errors[name]:>8}{p50:>9.1f}{p95:>9.1f}{p99:>9.1f}')
+        self.stdout.write(self.style.SUCCESS(f'{len(jobs)} requests in {total:.1f}s, {len(jobs) / total:.0f} req/s'))
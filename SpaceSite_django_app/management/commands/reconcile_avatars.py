@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from SpaceSite_django_app.avatars import process_avatar, thumbnail_name
+from SpaceSite_django_app.models import UserProfile
+from SpaceSite_django_app.storage import avatar_storage
+
+
+class Command(BaseCommand):
+    help = 'Fix profiles whose avatar files went missing or whose thumbnails were never generated'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Profiles loaded per query')
+
+    def handle(self, *args, **options):
+        profiles = (UserProfile.objects.exclude(user_photo='').exclude(user_photo__isnull=True)
+                    .only('id', 'user_photo', 'avatar_hash').order_by('id'))
+        missing, processed = [], 0
+
+        for profile in profiles.iterator(chunk_size=options['batch_size']):
+            name = profile.user_photo.name
+            if not avatar_storage.exists(name):
+                missing.append(profile.id)
+                continue
+            thumbnails = [thumbnail_name(profile.avatar_hash, size) for size in settings.AVATAR_THUMBNAIL_SIZES]
+            if not profile.avatar_hash or not all(avatar_storage.exists(thumb) for thumb in thumbnails):
+                try:
+                    process_avatar(name)
+                    processed += 1
+                except Exception as e:
+                    self.stderr.write(f'Could not process {name}: {e}')
+
+        for start in range(0, len(missing), options['batch_size']):
+            UserProfile.objects.filter(id__in=missing[start:start + options['batch_size']]).update(
+                user_photo=None, avatar_hash='')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Cleared {len(missing)} missing avatars, regenerated thumbnails for {processed} avatars'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from SpaceSite_django_app.counters import recount_post_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized post_count and last_post_at of every user'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Users written per bulk update')
+
+    def handle(self, *args, **options):
+        fixed = recount_post_counters(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Corrected the post counters of {fixed} users'))
@@ -0,0 +1,210 @@
+# metrics.py
+import bisect
+import contextvars
+import threading
+import time
+
+import requests
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template import base as template_base
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+_current = contextvars.ContextVar('request_timings', default=None)
+_install_lock = threading.Lock()
+_installed = False
+
+
+class RequestTimings:
+    """
+    Time spent by the current request in the database, in templates and in
+    outbound HTTP calls, in seconds.
+    """
+    __slots__ = ('db', 'queries', 'template', 'template_depth', 'http', 'http_calls')
+
+    def __init__(self):
+        self.db = self.template = self.http = 0.0
+        self.queries = self.template_depth = self.http_calls = 0
+
+
+class Histogram:
+    """
+    Prometheus histogram with one label, safe to update from several threads.
+    """
+
+    def __init__(self, name, documentation, label, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_value, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = {label_value: (list(counts), total) for label_value, (counts, total) in self._series.items()}
+        for label_value, (counts, total) in sorted(series.items()):
+            label = f'{self.label}="{label_value}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label}}} {total}')
+            lines.append(f'{self.name}_count{{{label}}} {cumulative}')
+        return lines
+
+
+class Counter:
+    """
+    Prometheus counter with one label, safe to update from several threads.
+    """
+
+    def __init__(self, name, documentation, label):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_value, amount=1):
+        with self._lock:
+            self._values[label_value] = self._values.get(label_value, 0) + amount
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            values = dict(self._values)
+        for label_value, value in sorted(values.items()):
+            lines.append(f'{self.name}{{{self.label}="{label_value}"}} {value}')
+        return lines
+
+
+REQUEST_DURATION = Histogram('spacesite_request_duration_seconds', 'Wall time of requests.', 'view',
+                             DURATION_BUCKETS)
+DB_DURATION = Histogram('spacesite_db_duration_seconds', 'SQL time per request.', 'view', DURATION_BUCKETS)
+DB_QUERIES = Histogram('spacesite_db_queries', 'SQL queries per request.', 'view', QUERY_COUNT_BUCKETS)
+TEMPLATE_DURATION = Histogram('spacesite_template_duration_seconds', 'Template render time per request.', 'view',
+                              DURATION_BUCKETS)
+HTTP_DURATION = Histogram('spacesite_outbound_http_duration_seconds', 'Outbound HTTP time per request.', 'view',
+                          DURATION_BUCKETS)
+HISTOGRAMS = (REQUEST_DURATION, DB_DURATION, DB_QUERIES, TEMPLATE_DURATION, HTTP_DURATION)
+
+POST_FRAGMENT_LOOKUPS = Counter('spacesite_post_fragment_cache_lookups_total',
+                                'Rendered post card lookups in the fragment cache.', 'result')
+COUNTERS = (POST_FRAGMENT_LOOKUPS,)
+
+
+def _time_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db += time.perf_counter() - started
+        timings.queries += 1
+
+
+def _add_query_timer(connection, **kwargs):
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+def _timed_template_render(render):
+    def wrapper(self, context):
+        timings = _current.get()
+        if timings is None:
+            return render(self, context)
+        # Included templates render inside their parent; only the outermost one is timed.
+        outermost = timings.template_depth == 0
+        timings.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            timings.template_depth -= 1
+            if outermost:
+                timings.template += time.perf_counter() - started
+    return wrapper
+
+
+def _timed_send(send):
+    def wrapper(self, request, **kwargs):
+        timings = _current.get()
+        if timings is None:
+            return send(self, request, **kwargs)
+        started = time.perf_counter()
+        try:
+            return send(self, request, **kwargs)
+        finally:
+            timings.http += time.perf_counter() - started
+            timings.http_calls += 1
+    return wrapper
+
+
+def install():
+    """
+    Hook the query, template and outbound HTTP timers in, once per process.
+
+    The hooks read the timings of the current request from a context
+    variable, so they cost a single lookup outside of requests and follow
+    the request into sync_to_async threads.
+    """
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        connection_created.connect(_add_query_timer)
+        for connection in connections.all(initialized_only=True):
+            _add_query_timer(connection)
+        template_base.Template.render = _timed_template_render(template_base.Template.render)
+        requests.Session.send = _timed_send(requests.Session.send)
+        _installed = True
+
+
+def start_request():
+    """
+    Start collecting timings for the current request.
+
+    Returns:
+        tuple: The RequestTimings and a token for finish_request().
+    """
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def finish_request(view, timings, token, duration):
+    """
+    Stop collecting timings and add them to the histograms of `view`.
+    """
+    _current.reset(token)
+    REQUEST_DURATION.observe(view, duration)
+    DB_DURATION.observe(view, timings.db)
+    DB_QUERIES.observe(view, timings.queries)
+    TEMPLATE_DURATION.observe(view, timings.template)
+    HTTP_DURATION.observe(view, timings.http)
+
+
+def render_metrics():
+    """
+    Return every histogram and counter in the Prometheus text exposition format.
+    """
+    lines = []
+    for metric in HISTOGRAMS + COUNTERS:
+        lines.extend(metric.expose())
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,204 @@
+# middleware.py
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import FileResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence, compress_string
+
+from . import metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = frozenset((
+    'text/html', 'text/plain', 'text/css', 'text/javascript', 'application/javascript',
+    'application/json', 'application/x-ndjson', 'application/xml', 'image/svg+xml',
+))
+# Upper bound of the random padding added to gzip output (as GZipMiddleware does).
+GZIP_MAX_RANDOM_BYTES = 100
+
+
+class TopMessageMiddleware:
+    """
+    Persist top messages set during the request into the response.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        storage = getattr(request, '_top_message_storage', None)
+        if storage is not None:
+            storage.update(response)
+        return response
+
+
+class PerformanceMiddleware:
+    """
+    Time every request and its database, template and outbound HTTP work.
+
+    The totals are added to the per-view histograms served at /metrics and,
+    when SERVER_TIMING is on, sent back in a Server-Timing header. Keep this
+    middleware first so session saves and other middleware are included.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        metrics.install()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        timings, token = metrics.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            duration = self.finish(request, timings, token, started)
+        return self.add_header(response, timings, duration)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        timings, token = metrics.start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            duration = self.finish(request, timings, token, started)
+        return self.add_header(response, timings, duration)
+
+    def finish(self, request, timings, token, started):
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        # Unresolved paths share one label so 404 scans cannot grow the series.
+        view = (match.url_name or match.view_name) if match else 'unmatched'
+        metrics.finish_request(view, timings, token, duration)
+        return duration
+
+    def add_header(self, response, timings, duration):
+        if settings.SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'db;dur={timings.db * 1000:.1f};desc="{timings.queries} queries", '
+                f'tpl;dur={timings.template * 1000:.1f}, '
+                f'http;dur={timings.http * 1000:.1f};desc="{timings.http_calls} calls", '
+                f'total;dur={duration * 1000:.1f}'
+            )
+        return response
+
+
+def accepted_encodings(header):
+    """
+    Return the content codings an Accept-Encoding header allows (q > 0).
+    """
+    encodings = set()
+    for item in header.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        q = params.strip()
+        if q.startswith('q='):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            encodings.add(coding)
+    return encodings
+
+
+class CompressionMiddleware:
+    """
+    Compress HTML, JSON and other text responses with brotli or gzip.
+
+    Brotli is preferred when the client accepts it and the package is
+    installed, except on responses that carry a CSRF token: those always use
+    gzip with the random-length header padding of Django's GZipMiddleware
+    ("Heal the Breach"), which makes BREACH-style length probing impractical.
+    Responses under COMPRESSION_MIN_SIZE bytes, already encoded responses
+    and files (static files come precompressed from WhiteNoise, media is
+    served by nginx) are passed through. Keep this middleware right after
+    PerformanceMiddleware so it sees the final response body.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or isinstance(response, FileResponse):
+            return response
+        if response.get('Content-Type', '').partition(';')[0].strip() not in COMPRESSIBLE_TYPES:
+            return response
+        if response.streaming:
+            # Chunks of async iterators cannot be compressed from a sync hook.
+            if response.is_async:
+                return response
+        elif len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encodings = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        # CsrfViewMiddleware (re)sends the cookie whenever get_token() was called,
+        # so the cookie marks responses with a token in them.
+        has_csrf_token = settings.CSRF_COOKIE_NAME in response.cookies
+
+        if response.streaming:
+            if 'gzip' not in encodings:
+                return response
+            response.streaming_content = compress_sequence(response.streaming_content,
+                                                           max_random_bytes=GZIP_MAX_RANDOM_BYTES)
+            del response.headers['Content-Length']
+            encoding = 'gzip'
+        else:
+            if brotli is not None and settings.COMPRESSION_BROTLI and 'br' in encodings and not has_csrf_token:
+                compressed = brotli.compress(response.content, mode=brotli.MODE_TEXT,
+                                             quality=settings.COMPRESSION_BROTLI_QUALITY)
+                encoding = 'br'
+            elif 'gzip' in encodings:
+                compressed = compress_string(response.content, max_random_bytes=GZIP_MAX_RANDOM_BYTES)
+                encoding = 'gzip'
+            else:
+                return response
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # The body changed, so a strong ETag has to become weak (RFC 9110 8.8.1);
+        # If-None-Match uses the weak comparison, so revalidation keeps working.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
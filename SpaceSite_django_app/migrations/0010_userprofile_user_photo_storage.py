@@ -0,0 +1,19 @@
+# Generated by Django 5.0.6 on 2026-10-18 15:02
+
+import SpaceSite_django_app.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SpaceSite_django_app', '0009_userprofile_avatar_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userprofile',
+            name='user_photo',
+            field=models.ImageField(blank=True, null=True, storage=SpaceSite_django_app.storage.ContentAddressedStorage(), upload_to='avatars/'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.0.6 on 2026-10-18 16:40
+
+from django.db import migrations
+
+GIN_INDEX_NAME = 'post_content_search_idx'
+
+SQLITE_FORWARDS = [
+    "CREATE VIRTUAL TABLE post_fts USING fts5(content, tokenize='porter unicode61')",
+    "INSERT INTO post_fts(rowid, content) SELECT id, content FROM SpaceSite_django_app_post",
+]
+
+SQLITE_BACKWARDS = [
+    'DROP TABLE IF EXISTS post_fts',
+]
+
+
+def _gin_index():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+    return GinIndex(SearchVector('content', config='english'), name=GIN_INDEX_NAME)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.add_index(apps.get_model('SpaceSite_django_app', 'Post'), _gin_index())
+    elif vendor == 'sqlite':
+        for statement in SQLITE_FORWARDS:
+            schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.remove_index(apps.get_model('SpaceSite_django_app', 'Post'), _gin_index())
+    elif vendor == 'sqlite':
+        for statement in SQLITE_BACKWARDS:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SpaceSite_django_app', '0010_userprofile_user_photo_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
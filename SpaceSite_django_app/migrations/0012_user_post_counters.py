@@ -0,0 +1,54 @@
+# Generated by Django 5.0.6 on 2026-10-18 15:44
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_posts(apps, schema_editor):
+    User = apps.get_model('SpaceSite_django_app', 'User')
+    Post = apps.get_model('SpaceSite_django_app', 'Post')
+    posts = Post.objects.filter(user_id=OuterRef('pk')).order_by().values('user_id')
+    User.objects.update(
+        post_count=Coalesce(Subquery(posts.annotate(count=Count('id')).values('count')), 0),
+        last_post_at=Subquery(posts.annotate(last=Max('created_at')).values('last')),
+    )
+
+
+def create_last_post_index(apps, schema_editor):
+    # PostgreSQL sorts NULLs first in descending order; SQLite already puts them last
+    # and rejects NULLS LAST in an index definition.
+    nulls_last = ' NULLS LAST' if schema_editor.connection.vendor == 'postgresql' else ''
+    schema_editor.execute(f'CREATE INDEX user_last_post_at_idx ON "SpaceSite_django_app_user" '
+                          f'("last_post_at" DESC{nulls_last}, "username")')
+
+
+def drop_last_post_index(apps, schema_editor):
+    schema_editor.execute('DROP INDEX user_last_post_at_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SpaceSite_django_app', '0011_post_search_index'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='last_post_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-post_count', 'username'], name='user_post_count_idx'),
+        ),
+        migrations.RunPython(create_last_post_index, drop_last_post_index),
+        migrations.RunPython(count_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.6 on 2026-10-18 16:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SpaceSite_django_app', '0014_userprofile_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-created_at', '-id', 'updated_at'], name='post_created_at_id_updated_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_created_at_id_idx',
+        ),
+    ]
@@ -4,6 +4,10 @@ from django import forms
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Length, Substr
+from django.db.models.lookups import GreaterThan
+
+from .storage import avatar_storage
 
 
 class User(AbstractUser):
@@ -14,33 +18,92 @@ class User(AbstractUser):
     email = models.EmailField(unique=True)
     hashed_password = models.CharField(max_length=128)
     role = models.CharField(max_length=5, choices=ROLE_CHOICES, default='user')
+    # Denormalized from Post, see counters.py.
+    post_count = models.PositiveIntegerField(default=0)
+    last_post_at = models.DateTimeField(blank=True, null=True)
+
+    COUNTER_FIELDS = ('post_count', 'last_post_at')
+
+    class Meta(AbstractUser.Meta):
+        swappable = 'AUTH_USER_MODEL'
+        indexes = [
+            # Backs the role filter of the admin user list, which is ordered by username.
+            models.Index(fields=['role', 'username'], name='user_role_username_idx'),
+            models.Index(fields=['-post_count', 'username'], name='user_post_count_idx'),
+            # The last_post_at index needs NULLS LAST on PostgreSQL, see migration 0012.
+        ]
 
     def __str__(self):
         return self.username
 
+    def save(self, *args, **kwargs):
+        # Counters are only written with F() updates; a plain save of an instance
+        # loaded before a post was created must not write back stale values.
+        if not self._state.adding and self.pk is not None and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [field.name for field in self._meta.concrete_fields
+                                       if not field.primary_key and field.name not in self.COUNTER_FIELDS
+                                       and field.attname not in deferred]
+        super().save(*args, **kwargs)
+
 
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     first_name = models.CharField(max_length=30, blank=True, null=True)
     last_name = models.CharField(max_length=30, blank=True, null=True)
     phone_number = models.CharField(max_length=15, blank=True, null=True)
-    user_photo = models.ImageField(upload_to='avatars/', blank=True, null=True)
+    user_photo = models.ImageField(upload_to='avatars/', storage=avatar_storage, blank=True, null=True)
+    # SHA-256 of user_photo, set once its thumbnails exist (see avatars.process_avatar).
+    avatar_hash = models.CharField(max_length=64, blank=True, default='')
     user_age = models.IntegerField(blank=True, null=True)
+    # Drives the profile page ETag (see views.profile_etag).
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.user.username
 
 
+class PostQuerySet(models.QuerySet):
+    def with_preview(self):
+        """
+        Defer `content` and annotate the first Post.PREVIEW_LENGTH characters as
+        `preview`, plus `is_truncated`; both are computed by the database, so
+        listings never fetch full post bodies.
+        """
+        return self.defer('content').annotate(
+            preview=Substr('content', 1, Post.PREVIEW_LENGTH),
+            is_truncated=GreaterThan(Length('content'), Post.PREVIEW_LENGTH),
+        )
+
+
 class Post(models.Model):
+    PREVIEW_LENGTH = 300
+
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = PostQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Backs keyset pagination of the feed (see pagination.paginate_by_cursor);
+            # updated_at lets the home page read its ETag keys from the index alone.
+            models.Index(fields=['-created_at', '-id', 'updated_at'], name='post_created_at_id_updated_idx'),
+            # Backs the per-user post lists (see views.user_posts).
+            models.Index(fields=['user', '-created_at', '-id'], name='post_user_created_at_id_idx'),
+        ]
 
     def __str__(self):
         return self.content[:50]  # Return the first 50 characters of the post content
 
     def truncated_content(self):
-        return self.content[:300] + '...' if len(self.content) > 500 else self.content
+        if hasattr(self, 'preview'):
+            return self.preview + '...' if self.is_truncated else self.preview
+        if len(self.content) > self.PREVIEW_LENGTH:
+            return self.content[:self.PREVIEW_LENGTH] + '...'
+        return self.content
 
 
 class PostForm(forms.ModelForm):
@@ -0,0 +1,124 @@
+# pagination.py
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+
+
+def encode_cursor(created_at, pk, reverse=False):
+    """
+    Build an opaque cursor token pointing at the (created_at, id) of a row.
+
+    Args:
+        created_at (datetime): Creation time of the boundary row.
+        pk (int): Primary key of the boundary row.
+        reverse (bool): True for a cursor that walks towards newer rows.
+
+    Returns:
+        str: URL-safe token.
+    """
+    payload = json.dumps([created_at.isoformat(), pk, int(reverse)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Decode a token produced by `encode_cursor`.
+
+    Returns:
+        tuple | None: (created_at, pk, reverse), or None if the token is malformed.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        created_at, pk, reverse = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(pk), bool(reverse)
+    except (ValueError, TypeError):
+        return None
+
+
+def _row_key(row):
+    if isinstance(row, dict):
+        return row['created_at'], row['id']
+    return row.created_at, row.id
+
+
+class CursorPage:
+    """
+    One slice of a keyset-paginated listing.
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def _cursor_queryset(queryset, cursor, per_page):
+    position = decode_cursor(cursor) if cursor else None
+    if position is None:
+        return queryset.order_by('-created_at', '-id')[:per_page + 1], None
+    created_at, pk, reverse = position
+    if not reverse:
+        return (queryset.filter(created_at__lte=created_at)
+                .filter(Q(created_at__lt=created_at) | Q(id__lt=pk))
+                .order_by('-created_at', '-id')[:per_page + 1]), False
+    return (queryset.filter(created_at__gte=created_at)
+            .filter(Q(created_at__gt=created_at) | Q(id__gt=pk))
+            .order_by('created_at', 'id')[:per_page + 1]), True
+
+
+def _cursor_page(rows, per_page, reverse):
+    has_more = len(rows) > per_page
+    if reverse is None:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(*_row_key(rows[-1])) if has_more else None
+        return CursorPage(rows, next_cursor=next_cursor)
+    if not reverse:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(*_row_key(rows[-1])) if has_more else None
+        previous_cursor = encode_cursor(*_row_key(rows[0]), reverse=True) if rows else None
+        return CursorPage(rows, next_cursor=next_cursor, previous_cursor=previous_cursor)
+    rows = rows[:per_page][::-1]
+    previous_cursor = encode_cursor(*_row_key(rows[0]), reverse=True) if has_more else None
+    next_cursor = encode_cursor(*_row_key(rows[-1])) if rows else None
+    return CursorPage(rows, next_cursor=next_cursor, previous_cursor=previous_cursor)
+
+
+def paginate_by_cursor(queryset, cursor=None, per_page=12):
+    """
+    Paginate `queryset` newest first, keyed on (created_at, id).
+
+    Each page is a single index range scan on (created_at DESC, id DESC):
+    no COUNT(*) and no OFFSET, so deep pages cost the same as the first one.
+
+    Args:
+        queryset (QuerySet): Rows with `created_at` and `id` columns.
+        cursor (str): Token from a previous page, or None for the newest page.
+        per_page (int): Number of rows per page.
+
+    Returns:
+        CursorPage: The requested page.
+    """
+    page_queryset, reverse = _cursor_queryset(queryset, cursor, per_page)
+    return _cursor_page(list(page_queryset), per_page, reverse)
+
+
+async def apaginate_by_cursor(queryset, cursor=None, per_page=12):
+    """
+    Async version of paginate_by_cursor().
+    """
+    page_queryset, reverse = _cursor_queryset(queryset, cursor, per_page)
+    return _cursor_page([row async for row in page_queryset], per_page, reverse)
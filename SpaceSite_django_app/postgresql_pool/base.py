@@ -0,0 +1,169 @@
+# postgresql_pool/base.py
+import threading
+import time
+
+from django.db.backends.postgresql import base
+from django.utils.asyncio import async_unsafe
+from psycopg2 import extensions
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(base.Database.OperationalError):
+    """
+    No pooled connection became free within the pool timeout.
+    """
+
+
+class ConnectionPool:
+    """
+    Process-wide pool of open psycopg2 connections, shared by every thread.
+
+    Connections are handed out most recently used first, so idle ones beyond
+    the current load age out through `max_lifetime`. When all `max_size`
+    connections are busy, getconn() waits up to `timeout` seconds for one.
+    """
+
+    def __init__(self, max_size=20, timeout=10.0, max_lifetime=3600.0):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self._idle = []
+        self._opened_at = {}
+        self._size = 0
+        self._condition = threading.Condition()
+
+    def getconn(self, connect, check=None):
+        """
+        Return an idle connection, or one opened with `connect()` while the
+        pool is below `max_size`.
+
+        Args:
+            connect (callable): Opens a new connection.
+            check (callable): Optional health check for idle connections;
+                those it returns False for are closed and replaced.
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._condition:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout(f'No database connection free after {self.timeout}s '
+                                          f'({self.max_size} in use)')
+                    self._condition.wait(remaining)
+                if not self._idle:
+                    self._size += 1
+                    break
+                connection = self._idle.pop()
+            if check is None or check(connection):
+                return connection
+            self.putconn(connection, discard=True)
+        try:
+            connection = connect()
+        except BaseException:
+            self._release_slot()
+            raise
+        self._opened_at[id(connection)] = time.monotonic()
+        return connection
+
+    def putconn(self, connection, discard=False):
+        """
+        Return `connection` to the pool, or close it when `discard` is set, when
+        it is broken or when it is older than `max_lifetime`.
+        """
+        opened_at = self._opened_at.get(id(connection), 0)
+        if not discard and not connection.closed:
+            try:
+                if connection.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+            except base.Database.Error:
+                discard = True
+        if discard or connection.closed or time.monotonic() - opened_at > self.max_lifetime:
+            self._opened_at.pop(id(connection), None)
+            try:
+                connection.close()
+            except base.Database.Error:
+                pass
+            self._release_slot()
+            return
+        with self._condition:
+            self._idle.append(connection)
+            self._condition.notify()
+
+    def close(self):
+        """
+        Close the idle connections; connections in use are closed when returned.
+        """
+        with self._condition:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            self.putconn(connection, discard=True)
+
+    def _release_slot(self):
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    The PostgreSQL backend with connections taken from a ConnectionPool.
+
+    Django closes connections at the end of every request when CONN_MAX_AGE is
+    0; here closing hands the connection back to the pool instead. That keeps
+    connections open across requests even under ASGI, where each request runs
+    its database calls in a thread of its own and persistent per-thread
+    connections would be opened for every request and never reused.
+
+    Pool options go in OPTIONS['pool']: `max_size`, `timeout` and
+    `max_lifetime`, in seconds.
+
+    Pools are kept per alias and server, database and user, so connections
+    opened for one database are never handed out for another, as when the
+    test runner switches NAME to the test database.
+    """
+    pool = None
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop('pool', None)
+        return conn_params
+
+    def get_pool(self, conn_params):
+        """
+        Return the process-wide pool for connections opened with `conn_params`.
+        """
+        key = (self.alias, conn_params.get('host'), conn_params.get('port'),
+               conn_params.get('dbname'), conn_params.get('user'))
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(**self.settings_dict['OPTIONS'].get('pool', {}))
+            return pool
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        def connect():
+            return super(DatabaseWrapper, self).get_new_connection(conn_params)
+
+        check = self._is_usable if self.settings_dict['CONN_HEALTH_CHECKS'] else None
+        # Remembered so the connection goes back to the pool it came from.
+        self.pool = self.get_pool(conn_params)
+        return self.pool.getconn(connect, check)
+
+    @staticmethod
+    def _is_usable(connection):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except base.Database.Error:
+            return False
+        return True
+
+    def _close(self):
+        if self.connection is not None:
+            # Inside atomic() the wrapper keeps its reference after close(), so
+            # the connection must not go back to the pool for others to use.
+            self.pool.putconn(self.connection, discard=self.errors_occurred or self.in_atomic_block)
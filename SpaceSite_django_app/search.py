@@ -0,0 +1,130 @@
+# search.py
+import re
+
+from django.db import connection
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Post
+
+SEARCH_CONFIG = 'english'
+SQLITE_FTS_TABLE = 'post_fts'
+# Deepest result a search can page to. Every page ranks all the rows before it,
+# and larger values overflow the database's integer OFFSET.
+MAX_OFFSET = 10_000
+
+# Highlight markers put around matches by the database, swapped for <mark>
+# once the rest of the snippet has been escaped.
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+
+_TERM = re.compile(r'\w+')
+
+
+def search_vector():
+    """
+    Return the expression the PostgreSQL GIN index is built on. Queries must
+    use the same expression for the planner to pick the index.
+    """
+    from django.contrib.postgres.search import SearchVector
+    return SearchVector('content', config=SEARCH_CONFIG)
+
+
+def _fts5_query(query):
+    # Quote every word so FTS5 operators in user input are matched literally.
+    return ' '.join(f'"{term}"' for term in _TERM.findall(query))
+
+
+def _highlight(snippet):
+    return mark_safe(escape(snippet).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>'))
+
+
+def _search_postgresql(query, limit, offset):
+    from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+    search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type='websearch')
+    posts = (Post.objects.select_related('user')
+             .annotate(search=search_vector())
+             .filter(search=search_query)
+             .annotate(rank=SearchRank(search_vector(), search_query),
+                       snippet=SearchHeadline('content', search_query, config=SEARCH_CONFIG,
+                                              start_sel=_MARK_START, stop_sel=_MARK_END, max_fragments=2))
+             .order_by('-rank', '-id')[offset:offset + limit])
+    return [(post, post.snippet, post.rank) for post in posts]
+
+
+def _search_sqlite(query, limit, offset):
+    match = _fts5_query(query)
+    if not match:
+        return []
+    with connection.cursor() as cursor:
+        # bm25() is lower for better matches.
+        cursor.execute(
+            f"SELECT rowid, -bm25({SQLITE_FTS_TABLE}), "
+            f"snippet({SQLITE_FTS_TABLE}, 0, %s, %s, '…', 24) "
+            f"FROM {SQLITE_FTS_TABLE} WHERE {SQLITE_FTS_TABLE} MATCH %s "
+            f"ORDER BY bm25({SQLITE_FTS_TABLE}), rowid DESC LIMIT %s OFFSET %s",
+            [_MARK_START, _MARK_END, match, limit, offset])
+        rows = cursor.fetchall()
+    posts = Post.objects.select_related('user').in_bulk([row[0] for row in rows])
+    return [(posts[pk], snippet, rank) for pk, rank, snippet in rows if pk in posts]
+
+
+def _search_fallback(query, limit, offset):
+    terms = _TERM.findall(query)
+    if not terms:
+        return []
+    posts = Post.objects.select_related('user').order_by('-created_at', '-id')
+    for term in terms:
+        posts = posts.filter(content__icontains=term)
+    return [(post, post.content[:200], None) for post in posts[offset:offset + limit]]
+
+
+def search_posts(query, limit=20, offset=0):
+    """
+    Full-text search over post content, best matches first.
+
+    Uses the GIN index on PostgreSQL and the FTS5 table on SQLite; other
+    databases fall back to a sequential icontains scan.
+
+    Args:
+        query (str): Words to look for; all of them must match.
+        limit (int): Maximum number of results.
+        offset (int): Number of results to skip.
+
+    Returns:
+        list: Dicts with the `post`, an HTML `snippet` with matches wrapped
+        in <mark>, and the `rank` (higher is better).
+    """
+    if connection.vendor == 'postgresql':
+        rows = _search_postgresql(query, limit, offset)
+    elif connection.vendor == 'sqlite':
+        rows = _search_sqlite(query, limit, offset)
+    else:
+        rows = _search_fallback(query, limit, offset)
+    return [{'post': post, 'snippet': _highlight(snippet), 'rank': rank} for post, snippet, rank in rows]
+
+
+def index_posts(posts):
+    """
+    Add or refresh `posts` in the SQLite FTS5 table in one batch.
+    Post saves do this through signals; call it after bulk_create() or update().
+    PostgreSQL maintains its index by itself.
+
+    Args:
+        posts (Iterable[tuple[int, str]]): (id, content) pairs.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f'INSERT OR REPLACE INTO {SQLITE_FTS_TABLE}(rowid, content) VALUES (%s, %s)',
+                           list(posts))
+
+
+def unindex_posts(ids):
+    """
+    Remove the posts `ids` from the SQLite FTS5 table.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid = %s', [(pk,) for pk in ids])
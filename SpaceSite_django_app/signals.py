@@ -0,0 +1,41 @@
+# signals.py
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .caching import bump_feed_generation, invalidate_post_fragments
+from .models import Post, User
+from .search import index_posts, unindex_posts
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def drop_post_fragments(sender, instance, **kwargs):
+    invalidate_post_fragments([instance.id])
+    bump_feed_generation()
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'content' in update_fields:
+        index_posts([(instance.id, instance.content)])
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    unindex_posts([instance.id])
+
+
+@receiver(pre_save, sender=User)
+def detect_username_change(sender, instance, update_fields=None, **kwargs):
+    instance._username_changed = False
+    if instance.pk is None or (update_fields is not None and 'username' not in update_fields):
+        return
+    old_username = User.objects.filter(pk=instance.pk).values_list('username', flat=True).first()
+    instance._username_changed = old_username is not None and old_username != instance.username
+
+
+@receiver(post_save, sender=User)
+def drop_user_post_fragments(sender, instance, **kwargs):
+    if getattr(instance, '_username_changed', False):
+        invalidate_post_fragments(Post.objects.filter(user_id=instance.pk).values_list('id', flat=True))
+        bump_feed_generation()
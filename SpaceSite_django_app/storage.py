@@ -0,0 +1,76 @@
+# storage.py
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+# Names produced by ContentAddressedStorage and avatars.thumbnail_name; their bytes never change.
+CONTENT_ADDRESSED_NAME = re.compile(r'^avatars/(?:[0-9a-f]{2}/[0-9a-f]{64}|thumbs/[0-9a-f]{64}_\d+)\.\w+$')
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage that names every file after the SHA-256 of its content.
+
+    `avatars/me.jpg` is stored as `avatars/ab/ab12...ef.jpg`. Uploading the same
+    bytes twice yields the same name and a single file on disk, and a name always
+    refers to the same bytes, so URLs can be cached forever.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if CONTENT_ADDRESSED_NAME.match(name):
+            # Derived files (thumbnails) already carry the hash of their source.
+            return super().save(name, content, max_length)
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        directory, filename = posixpath.split(name.replace('\\', '/'))
+        extension = os.path.splitext(filename)[1].lower()
+        hex_digest = digest.hexdigest()
+        return super().save(posixpath.join(directory, hex_digest[:2], hex_digest + extension), content, max_length)
+
+    def get_available_name(self, name, max_length=None):
+        # An existing file under this name already holds identical bytes.
+        return name
+
+    def _save(self, name, content):
+        full_path = self.path(name)
+        if os.path.exists(full_path):
+            return name
+
+        directory = os.path.dirname(full_path)
+        if self.directory_permissions_mode is not None:
+            old_umask = os.umask(0o777 & ~self.directory_permissions_mode)
+            try:
+                os.makedirs(directory, self.directory_permissions_mode, exist_ok=True)
+            finally:
+                os.umask(old_umask)
+        else:
+            os.makedirs(directory, exist_ok=True)
+
+        # Write to a temporary file and rename it into place, so concurrent uploads
+        # of the same content never see a partial file.
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                for chunk in content.chunks():
+                    file.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return name
+
+
+avatar_storage = ContentAddressedStorage()
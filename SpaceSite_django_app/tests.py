@@ -1,3 +1,641 @@
-from django.test import TestCase
+import json
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import CommandError, call_command
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .api import PostExportAPIView
+from .authentication import ACCESS_TOKEN_COOKIE, token_for_user
+from .avatars import thumbnail_name
+from .benchmarking import start_unsplash_stub
+from .blacklist import CachedRefreshToken, token_cache, warm_blacklist_cache
+from .checks import check_feed_page_cache
+from .models import Post, User, UserProfile
+from .postgresql_pool import base as postgresql_pool
+from .search import MAX_OFFSET
+from .storage import avatar_storage
+from . import utils
+from .utils import _unsplash_pool_key, get_user_photo_url, load_unsplash_photo
+from .views import SearchView, serve_avatar
+
+
+def create_user(username='user', **fields):
+    user = User.objects.create_user(username=username, email=f'{username}@example.com', password='123', **fields)
+    UserProfile.objects.create(user=user)
+    return user
+
+
+def fill_unsplash_pool(photos=('https://images.example.com/1.jpg',), fetched_at=None):
+    cache.set(_unsplash_pool_key('universe galaxy cosmos'),
+              {'photos': list(photos), 'fetched_at': time.time() if fetched_at is None else fetched_at}, None)
+
+
+class StaleAccessTokenCookieTests(TestCase):
+    """
+    An expired or forged access token cookie must not lock the browser out.
+    """
+
+    def setUp(self):
+        self.user = create_user()
+        token = AccessToken.for_user(self.user)
+        token.set_exp(lifetime=-timedelta(minutes=1))
+        self.client.cookies[ACCESS_TOKEN_COOKIE] = str(token)
+
+    def test_login_page(self):
+        self.assertEqual(self.client.get(reverse('login')).status_code, 200)
+
+    def test_logout(self):
+        self.client.login(username='user', password='123')
+        response = self.client.get(reverse('logout'))
+        self.assertRedirects(response, reverse('login'), fetch_redirect_response=False)
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+    def test_public_api(self):
+        self.assertEqual(self.client.get(reverse('api_posts')).status_code, 200)
+
+    def test_forged_cookie(self):
+        self.client.cookies[ACCESS_TOKEN_COOKIE] = 'not-a-token'
+        self.assertEqual(self.client.get(reverse('api_posts')).status_code, 200)
+
+    def test_invalid_header_is_rejected(self):
+        response = self.client.get(reverse('api_posts'), HTTP_AUTHORIZATION='Bearer not-a-token')
+        self.assertEqual(response.status_code, 401)
+
+
+class RefreshTokenBlacklistTests(TestCase):
+
+    def setUp(self):
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        self.token = token_for_user(create_user())
+        warm_blacklist_cache()
+
+    def blacklist_elsewhere(self):
+        # Another worker blacklists the token: its row is in the database, but
+        # this process's cache never hears about it.
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=self.token['jti']))
+
+    def test_per_process_cache_checks_the_database(self):
+        self.blacklist_elsewhere()
+        with self.assertRaises(TokenError):
+            CachedRefreshToken(str(self.token))
+
+    def test_shared_cache_skips_the_database(self):
+        with mock.patch('SpaceSite_django_app.blacklist.TOKEN_CACHE_SHARED', True):
+            with self.assertNumQueries(0):
+                CachedRefreshToken(str(self.token))
+            CachedRefreshToken(str(self.token)).blacklist()
+            with self.assertRaises(TokenError):
+                CachedRefreshToken(str(self.token))
+
+
+class TokenRefreshClaimsTests(TestCase):
+    """
+    Refreshed tokens carry the user's current role, and only active users get them.
+    """
+
+    def setUp(self):
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        self.admin = create_user('admin', role='admin')
+        self.refresh = str(token_for_user(self.admin))
+
+    def refresh_tokens(self):
+        return self.client.post(reverse('token_refresh'), {'refresh': self.refresh})
+
+    def export(self, access):
+        return self.client.get(reverse('api_posts_export'), HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def test_demoted_admin_loses_the_export(self):
+        tokens = self.refresh_tokens().json()
+        self.assertEqual(self.export(tokens['access']).status_code, 200)
+
+        self.admin.role = 'user'
+        self.admin.save()
+        # The rotated refresh token still says admin; the new tokens must not.
+        self.refresh = tokens['refresh']
+        tokens = self.refresh_tokens().json()
+        self.assertEqual(AccessToken(tokens['access'])['role'], 'user')
+        self.assertEqual(CachedRefreshToken(tokens['refresh'])['role'], 'user')
+        self.assertEqual(self.export(tokens['access']).status_code, 403)
+
+    def test_inactive_user_gets_no_tokens(self):
+        self.admin.is_active = False
+        self.admin.save()
+        self.assertEqual(self.refresh_tokens().status_code, 401)
+
+
+class PostExportStreamingTests(TestCase):
+    """
+    The export streams under ASGI too, instead of being collected in memory first.
+    """
+
+    def setUp(self):
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        self.authorization = f'Bearer {token_for_user(create_user("admin", role="admin")).access_token}'
+        author = create_user('author')
+        for number in range(5):
+            Post.objects.create(user=author, content=f'Post number {number}')
+
+    async def test_asgi_export_streams_row_by_row(self):
+        with mock.patch.object(PostExportAPIView, 'chunk_size', 1), \
+                mock.patch.object(DjangoJSONEncoder, 'encode', autospec=True,
+                                  side_effect=json.JSONEncoder.encode) as encode:
+            response = await self.async_client.get(reverse('api_posts_export'),
+                                                   headers={'Authorization': self.authorization})
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.is_async)
+            lines = []
+            async for line in response:
+                # Nothing is encoded ahead of the line being sent.
+                self.assertEqual(encode.call_count, len(lines) + 1)
+                lines.append(json.loads(line))
+        self.assertEqual([line['content'] for line in lines], [f'Post number {number}' for number in range(5)])
+
+    def test_wsgi_export_streams(self):
+        response = self.client.get(reverse('api_posts_export'), HTTP_AUTHORIZATION=self.authorization)
+        self.assertFalse(response.is_async)
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 5)
+
+
+@override_settings(
+    CACHES={**settings.CACHES, 'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+                                           'LOCATION': 'spacesite_test_cache'}},
+    FEED_PAGE_CACHE_TIMEOUT=60,
+)
+class RootViewCacheBackendTests(TestCase):
+    """
+    The async home page must only reach a database-backed cache through async APIs.
+    """
+
+    def setUp(self):
+        call_command('createcachetable', verbosity=0)
+        fill_unsplash_pool()
+        Post.objects.create(user=create_user(), content='Saturn tonight')
+
+    def test_feed_page_cache(self):
+        first = self.client.get(reverse('root'))
+        self.assertEqual(first.status_code, 200)
+        self.assertContains(first, 'Saturn tonight')
+        second = self.client.get(reverse('root'))
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.content, first.content)
+
+    def test_logged_in(self):
+        self.client.login(username='user', password='123')
+        self.assertContains(self.client.get(reverse('root')), 'Saturn tonight')
+
+
+# Sessions from the cache, so the counts do not depend on the configured engine.
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cached_db')
+class ListingQueryCountTests(TestCase):
+    """
+    Listings must run a fixed number of queries whatever the number of posts
+    on the page (no per-post user or content lookups).
+    """
+
+    def setUp(self):
+        cache.clear()
+        fill_unsplash_pool()
+        self.author = create_user('author')
+        self.admin = create_user('admin', role='admin')
+
+    def add_posts(self, count):
+        for number in range(count):
+            Post.objects.create(user=self.author, content=f'Post number {number}. ' + 'Lorem ipsum. ' * 40)
+
+    def assert_num_queries(self, num, url, full_page):
+        """
+        Fetch `url` with one post and then with a full page of posts, and check
+        that both take `num` queries.
+        """
+        self.add_posts(1)
+        for posts in (1, full_page):
+            self.add_posts(posts - Post.objects.count())
+            with self.subTest(posts=posts), self.assertNumQueries(num):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content.count(b'Post number'), posts)
+
+    def test_root_cursor(self):
+        self.assert_num_queries(2, reverse('root'), 12)
+
+    def test_root_legacy_page(self):
+        self.assert_num_queries(3, reverse('root') + '?page=1', 12)
+
+    def test_root_logged_in(self):
+        self.client.login(username='author', password='123')
+        self.assert_num_queries(3, reverse('root'), 12)
+
+    def test_root_not_modified(self):
+        self.add_posts(12)
+        etag = self.client.get(reverse('root'))['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('root'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # Only the page keys are read, not the post bodies or previews.
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('content', queries[0]['sql'])
+
+        self.author.username = 'renamed'
+        self.author.save()
+        response = self.client.get(reverse('root'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'renamed')
+
+    def test_my_posts(self):
+        self.client.login(username='author', password='123')
+        self.assert_num_queries(3, reverse('my_posts'), 20)
+
+    def test_my_posts_more(self):
+        self.client.login(username='author', password='123')
+        self.assert_num_queries(3, reverse('my_posts_more'), 20)
+
+    def test_my_posts_not_modified(self):
+        self.add_posts(20)
+        self.client.login(username='author', password='123')
+        etag = self.client.get(reverse('my_posts'))['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('my_posts'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # The user, then only the keys of the slice: no previews.
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('content', queries[1]['sql'])
+
+    def test_admin_user_posts(self):
+        self.client.login(username='admin', password='123')
+        self.assert_num_queries(3, reverse('admin_user_posts', args=[self.author.id]), 20)
+
+    def test_admin_user_posts_more(self):
+        self.client.login(username='admin', password='123')
+        self.assert_num_queries(2, reverse('admin_user_posts_more', args=[self.author.id]), 20)
+
+
+class PostDetailETagTests(TestCase):
+    """
+    The post detail ETag covers everything the fragment and the JSON show.
+    """
+
+    def setUp(self):
+        self.author = create_user('author')
+        self.post = Post.objects.create(user=self.author, content='A long post about Saturn.')
+        self.url = reverse('post_detail', args=[self.post.id])
+
+    def test_unchanged_post_is_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_author_rename_changes_the_etag(self):
+        for number, url in enumerate((self.url, self.url + '?format=json')):
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                self.author.username = f'renamed{number}'
+                self.author.save()
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, self.author.username)
+
+
+class PageETagTests(TestCase):
+    """
+    Profile and post list pages answer 304 until what they show is edited.
+    """
+
+    def setUp(self):
+        self.author = create_user('author')
+        self.admin = create_user('admin', role='admin')
+        self.post = Post.objects.create(user=self.author, content='A long post about Saturn.')
+
+    def assert_revalidates(self, url, edit, text):
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        edit()
+        # A top message confirming the edit is shown once, without an ETag.
+        self.client.get(url)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, text)
+
+    def edit_profile(self):
+        response = self.client.post(reverse('profile_update', args=[self.author.id]), {'first_name': 'Valentina'})
+        self.assertEqual(response.status_code, 302)
+
+    def test_profile(self):
+        self.client.login(username='author', password='123')
+        self.assert_revalidates(reverse('profile', args=[self.author.id]), self.edit_profile, 'Valentina')
+
+    def test_admin_user_profile(self):
+        self.client.login(username='admin', password='123')
+        self.assert_revalidates(reverse('admin_user_profile', args=[self.author.id]), self.edit_profile, 'Valentina')
+
+    def test_my_posts(self):
+        def edit_post():
+            response = self.client.post(reverse('edit_post', args=[self.post.id]), {'content': 'Now about Jupiter.'})
+            self.assertEqual(response.status_code, 302)
+
+        self.client.login(username='author', password='123')
+        self.assert_revalidates(reverse('my_posts'), edit_post, 'Jupiter')
+
+
+class SearchPagingTests(TestCase):
+    """
+    Out-of-range pages and offsets are clamped instead of reaching the database.
+    """
+
+    def setUp(self):
+        Post.objects.create(user=create_user(), content='A long post about Saturn.')
+
+    def test_huge_page(self):
+        response = self.client.get(reverse('search'), {'q': 'saturn', 'page': '9' * 20})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['page'], MAX_OFFSET // SearchView.per_page + 1)
+        self.assertFalse(response.context['has_next'])
+
+    def test_huge_offset(self):
+        response = self.client.get(reverse('api_posts_search'), {'q': 'saturn', 'offset': '9' * 20})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'next': None, 'results': []})
+
+
+class MetricsAccessTests(TestCase):
+    """
+    Per-view timings are not public unless DEBUG is on.
+    """
+
+    def get(self, **headers):
+        return self.client.get(reverse('metrics'), **headers).status_code
+
+    @override_settings(METRICS_TOKEN='')
+    def test_no_token(self):
+        self.assertEqual(self.get(), 403)
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.get(), 200)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token(self):
+        self.assertEqual(self.get(), 403)
+        self.assertEqual(self.get(HTTP_AUTHORIZATION='Bearer wrong'), 403)
+        self.assertEqual(self.get(HTTP_AUTHORIZATION='Bearer secret'), 200)
+
+
+@override_settings(METRICS_TOKEN='secret')
+class FragmentCacheMetricsTests(TestCase):
+    """
+    Fragment cache hits and misses can be read from every worker's /metrics.
+    """
+
+    def setUp(self):
+        cache.clear()
+        fill_unsplash_pool()
+        author = create_user('author')
+        for number in range(3):
+            Post.objects.create(user=author, content=f'Post number {number}')
+
+    def lookups(self):
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        counts = {}
+        for line in response.content.decode().splitlines():
+            if line.startswith('spacesite_post_fragment_cache_lookups_total{'):
+                labels, value = line.split(' ')
+                counts[labels.split('"')[1]] = int(value)
+        return counts
+
+    def test_hits_and_misses_on_metrics(self):
+        before = self.lookups()
+        self.client.get(reverse('root'))
+        self.client.get(reverse('root'))
+        after = self.lookups()
+        self.assertEqual(after.get('miss', 0) - before.get('miss', 0), 3)
+        self.assertEqual(after.get('hit', 0) - before.get('hit', 0), 3)
+
+    def test_stats_command_needs_a_shared_cache(self):
+        with self.assertRaisesMessage(CommandError, '/metrics/'):
+            call_command('fragment_cache_stats', stdout=StringIO())
+
+
+class FeedPageCacheCheckTests(SimpleTestCase):
+    """
+    The home page cache can only be purged for every worker through a shared cache.
+    """
+
+    @override_settings(FEED_PAGE_CACHE_TIMEOUT=60)
+    def test_per_process_cache_is_an_error(self):
+        self.assertEqual([error.id for error in check_feed_page_cache(None)], ['SpaceSite_django_app.E001'])
+
+    @override_settings(FEED_PAGE_CACHE_TIMEOUT=60, CACHES={
+        **settings.CACHES, 'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+                                       'LOCATION': 'spacesite_test_cache'}})
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_feed_page_cache(None), [])
+
+    def test_disabled_cache_passes(self):
+        self.assertEqual(check_feed_page_cache(None), [])
+
+
+class UnsplashPoolTests(TestCase):
+    """
+    The photo pool against a local stand-in for the Unsplash API.
+    """
+    query = 'universe galaxy cosmos'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = start_unsplash_stub()
+        cls.addClassCleanup(cls.server.server_close)
+        cls.addClassCleanup(cls.server.shutdown)
+
+    def setUp(self):
+        cache.clear()
+        self.server.requests = 0
+        self.server.status = 200
+        self.server.photos = ['https://images.example.com/new-1.jpg', 'https://images.example.com/new-2.jpg']
+        settings_override = override_settings(
+            UNSPLASH_API_URL=f'http://127.0.0.1:{self.server.server_port}/search/photos',
+            UNSPLASH_ACCESS_KEY='test', UNSPLASH_TIMEOUT=2)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        # Same as _start_unsplash_refresh, keeping the threads so tests can wait for them.
+        self.refreshes = []
+
+        def record_refresh(query):
+            thread = threading.Thread(target=utils.refresh_unsplash_pool, args=(query,), daemon=True)
+            self.refreshes.append(thread)
+            thread.start()
+
+        patcher = mock.patch.object(utils, '_start_unsplash_refresh', record_refresh)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def wait_for_refreshes(self):
+        for thread in self.refreshes:
+            thread.join(5)
+
+    def test_pool_fills(self):
+        self.assertIsNone(load_unsplash_photo(self.query))
+        self.wait_for_refreshes()
+        self.assertEqual(self.server.requests, 1)
+        self.assertIn(load_unsplash_photo(self.query), self.server.photos)
+        self.assertEqual(len(self.refreshes), 1)
+
+    def test_stale_pool_refreshes_once(self):
+        fill_unsplash_pool(['https://images.example.com/old.jpg'], fetched_at=time.time() - 2 * settings.UNSPLASH_POOL_TTL)
+        for _ in range(5):
+            # The stale photo is still served while the pool refreshes.
+            self.assertIn(load_unsplash_photo(self.query),
+                          ['https://images.example.com/old.jpg'] + self.server.photos)
+        self.wait_for_refreshes()
+        self.assertEqual(len(self.refreshes), 1)
+        self.assertEqual(self.server.requests, 1)
+        self.assertIn(load_unsplash_photo(self.query), self.server.photos)
+
+    def test_failed_refresh_keeps_the_pool(self):
+        self.server.status = 500
+        fill_unsplash_pool(['https://images.example.com/old.jpg'], fetched_at=time.time() - 2 * settings.UNSPLASH_POOL_TTL)
+        with mock.patch('builtins.print'):
+            load_unsplash_photo(self.query)
+            self.wait_for_refreshes()
+        self.assertEqual(load_unsplash_photo(self.query), 'https://images.example.com/old.jpg')
+
+    def test_empty_pool_falls_back_to_default_photo(self):
+        self.server.photos = []
+        response = self.client.get(reverse('root'))
+        self.wait_for_refreshes()
+        self.assertContains(response, '/static/img/default_unsplash.jpg')
+        self.assertEqual(self.server.requests, 1)
+
+    def test_stub_error_falls_back_to_default_photo(self):
+        self.server.status = 500
+        with mock.patch('builtins.print'):
+            response = self.client.get(reverse('root'))
+            self.wait_for_refreshes()
+        self.assertContains(response, '/static/img/default_unsplash.jpg')
+        self.assertEqual(self.server.requests, 1)
+
+
+class SlowAvatarStorageTests(TestCase):
+    """
+    Avatar URLs come from the profile row; only reconcile_avatars looks at the
+    (possibly slow, remote) media storage.
+    """
+    avatar_hash = 'a' * 64
+
+    def setUp(self):
+        self.user = create_user()
+        self.profile = self.user.userprofile
+        self.profile.user_photo = f'avatars/aa/{self.avatar_hash}.jpg'
+        self.profile.avatar_hash = self.avatar_hash
+        self.profile.save()
+
+    def storage_forbidden(self):
+        untouchable = mock.Mock(side_effect=AssertionError('media storage was accessed'))
+        return mock.patch.multiple(avatar_storage, exists=untouchable, open=untouchable, size=untouchable,
+                                   listdir=untouchable)
+
+    def test_photo_url(self):
+        with self.storage_forbidden():
+            self.assertEqual(get_user_photo_url(self.profile), avatar_storage.url(thumbnail_name(self.avatar_hash, 256)))
+            # The original upload may carry EXIF metadata and is never linked.
+            self.profile.avatar_hash = ''
+            self.assertEqual(get_user_photo_url(self.profile), '/static/img/default_avatar.jpg')
+
+    def test_only_thumbnails_are_served(self):
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            original = self.profile.user_photo.name
+            thumbnail = thumbnail_name(self.avatar_hash, 256)
+            for name in (original, thumbnail):
+                avatar_storage.save(name, ContentFile(b'image'))
+            request = RequestFactory().get('/')
+            response = serve_avatar(request, thumbnail)
+            self.assertEqual(b''.join(response.streaming_content), b'image')
+            self.assertIn('immutable', response['Cache-Control'])
+            response.file_to_stream.close()
+            with self.assertRaises(Http404):
+                serve_avatar(request, original)
+
+    def test_profile_page(self):
+        self.client.login(username='user', password='123')
+        with self.storage_forbidden():
+            response = self.client.get(reverse('profile', args=[self.user.id]))
+        self.assertContains(response, avatar_storage.url(thumbnail_name(self.avatar_hash, 256)))
+
+    def test_reconcile_clears_missing_files(self):
+        other = create_user('other').userprofile
+        other.user_photo = f'avatars/bb/{"b" * 64}.jpg'
+        other.avatar_hash = 'b' * 64
+        other.save()
+
+        def slow_exists(name):
+            time.sleep(0.05)
+            # Every file of `other` exists; the avatar of `user` is gone.
+            return 'b' * 64 in name
+
+        with mock.patch.object(avatar_storage, 'exists', side_effect=slow_exists):
+            call_command('reconcile_avatars', stdout=StringIO())
+
+        self.profile.refresh_from_db()
+        other.refresh_from_db()
+        self.assertFalse(self.profile.user_photo)
+        self.assertEqual(self.profile.avatar_hash, '')
+        self.assertEqual(other.avatar_hash, 'b' * 64)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'PostgreSQL connection pool')
+class ConnectionPoolTests(TestCase):
+    """
+    Pooled connections only go to wrappers of the database they were opened on.
+    """
+
+    def setUp(self):
+        patcher = mock.patch.dict(postgresql_pool._pools, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Idle pooled connections would keep the test database from being dropped.
+        self.addCleanup(lambda: [pool.close() for pool in postgresql_pool._pools.values()])
+
+    def wrapper(self, name):
+        settings_dict = {**connection.settings_dict, 'ENGINE': 'SpaceSite_django_app.postgresql_pool',
+                         'NAME': name, 'CONN_MAX_AGE': 0, 'OPTIONS': {'pool': {'max_size': 2}}}
+        wrapper = postgresql_pool.DatabaseWrapper(settings_dict, alias='default')
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def current_database(self, wrapper):
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT current_database()')
+            return cursor.fetchone()[0]
+
+    def test_idle_connection_stays_with_its_database(self):
+        test_database = connection.settings_dict['NAME']
+        first = self.wrapper(test_database)
+        self.assertEqual(self.current_database(first), test_database)
+        first.close()
+
+        # Same alias, another database: as after the test runner renames NAME.
+        other = self.wrapper('postgres')
+        self.assertEqual(self.current_database(other), 'postgres')
+        self.assertIsNot(other.pool, first.pool)
+
+        again = self.wrapper(test_database)
+        self.assertEqual(self.current_database(again), test_database)
+        self.assertIs(again.pool, first.pool)
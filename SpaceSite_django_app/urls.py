@@ -1,15 +1,19 @@
 from django.conf import settings
 from django.conf.urls.static import static
-from django.urls import path
+from django.urls import path, re_path
 
+from .api import PostFeedAPIView, PostExportAPIView, PostSearchAPIView
 from .views import (
     RootView, LoginView, LogoutView, RegisterView, ProfileView, ProfileUpdateView, DeleteProfileView,
     CreatePostView, PostListView, PostEditView, PostDeleteView, AdminUserListView, AdminUserProfileView,
-    AdminUserPostsView, AdminPostEditView, AdminDeleteProfileView, AdminUserProfileEditView
+    AdminUserPostsView, AdminPostEditView, AdminDeleteProfileView, AdminUserProfileEditView, serve_avatar,
+    MyTokenObtainPairView, MyTokenRefreshView, SearchView, PostDetailView, metrics
 )
 
 urlpatterns = [
     path('', RootView.as_view(), name='root'),
+    path('search/', SearchView.as_view(), name='search'),
+    path('posts/<int:post_id>/', PostDetailView.as_view(), name='post_detail'),
     path('login/', LoginView.as_view(), name='login'),
     path('logout/', LogoutView.as_view(), name='logout'),
     path('register/', RegisterView.as_view(), name='register'),
@@ -18,15 +22,27 @@ urlpatterns = [
     path('profile/<int:user_id>/delete/', DeleteProfileView.as_view(), name='delete_profile'),
     path('create-post/', CreatePostView.as_view(), name='create_post'),
     path('my-posts/', PostListView.as_view(), name='my_posts'),
+    path('my-posts/more/', PostListView.as_view(fragment=True), name='my_posts_more'),
     path('edit-post/<int:post_id>/', PostEditView.as_view(), name='edit_post'),
     path('delete-post/<int:post_id>/', PostDeleteView.as_view(), name='delete_post'),
     path('for-admin/users/', AdminUserListView.as_view(), name='admin_user_list'),
     path('for-admin/user/<int:user_id>/profile/', AdminUserProfileView.as_view(), name='admin_user_profile'),
     path('for-admin/user/<int:user_id>/profile/edit/', AdminUserProfileEditView.as_view(), name='admin_user_profile_edit'),
     path('for-admin/user/<int:user_id>/posts/', AdminUserPostsView.as_view(), name='admin_user_posts'),
+    path('for-admin/user/<int:user_id>/posts/more/', AdminUserPostsView.as_view(fragment=True),
+         name='admin_user_posts_more'),
     path('for-admin/edit-post/<int:post_id>/', AdminPostEditView.as_view(), name='admin_edit_post'),
     path('for-admin/user/<int:user_id>/delete/', AdminDeleteProfileView.as_view(), name='admin_delete_profile'),
+    path('metrics/', metrics, name='metrics'),
+    path('api/token/', MyTokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('api/token/refresh/', MyTokenRefreshView.as_view(), name='token_refresh'),
+    path('api/posts/', PostFeedAPIView.as_view(), name='api_posts'),
+    path('api/posts/export/', PostExportAPIView.as_view(), name='api_posts_export'),
+    path('api/posts/search/', PostSearchAPIView.as_view(), name='api_posts_search'),
 ]
 
 if settings.DEBUG:
+    urlpatterns += [
+        re_path(r'^media/(?P<path>avatars/.*)$', serve_avatar, name='serve_avatar'),
+    ]
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
@@ -1,24 +1,33 @@
 # utils.py
-import os
+import hashlib
 import random
+import threading
+import time
 
 import requests
 from django.conf import settings
+from django.core.cache import cache
 from django.shortcuts import redirect
 from rest_framework import status
 
+from .avatars import thumbnail_name
+from .flash import get_top_message_storage
+
 
 def set_top_message(request,
                     message_class,
                     message_icon,
                     message_text):
-    request.session.pop('top_message', None)
     top_message = {
         "class": message_class,
         "icon": message_icon,
         "text": message_text
     }
-    request.session['top_message'] = top_message
+    get_top_message_storage(request).set(top_message)
+
+
+def pop_top_message(request):
+    return get_top_message_storage(request).pop()
 
 
 def redirect_with_message(request,
@@ -27,19 +36,13 @@ def redirect_with_message(request,
                           message_text,
                           status=status.HTTP_302_FOUND,
                           endpoint=None, logout=False):
-    top_message = {
-        "class": message_class,
-        "icon": message_icon,
-        "text": message_text
-    }
-    request.session['top_message'] = top_message
+    set_top_message(request, message_class, message_icon, message_text)
     if logout:
         endpoint = "/logout/?login=True"
     return redirect(endpoint, status=status)
 
 
-def load_unsplash_photo(query: str = "cosmos") -> str | None:
-    url = "https://api.unsplash.com/search/photos"
+def fetch_unsplash_photos(query: str = "cosmos") -> list[str]:
     headers = {
         "Accept-Version": "v1",
         "Authorization": f"Client-ID {settings.UNSPLASH_ACCESS_KEY}"
@@ -51,27 +54,94 @@ def load_unsplash_photo(query: str = "cosmos") -> str | None:
     }
 
     try:
-        response = requests.get(url, headers=headers, params=params)
+        response = requests.get(settings.UNSPLASH_API_URL, headers=headers, params=params,
+                                timeout=settings.UNSPLASH_TIMEOUT)
         response.raise_for_status()
         data = response.json()
-        if data.get('results'):
-            random_index = random.randint(0, len(data['results']) - 1)
-            image_url = data['results'][random_index]['urls']['regular']
-        else:
-            image_url = None
+        photos = [result['urls']['regular'] for result in data.get('results', [])]
     except requests.HTTPError as errh:
         print("HTTP error occurred:", errh)
-        image_url = None
-    except requests.RequestException as err:
+        photos = []
+    except (requests.RequestException, ValueError, KeyError, TypeError) as err:
         print("An error occurred:", err)
-        image_url = None
+        photos = []
+
+    return photos
+
+
+def _unsplash_pool_key(query: str) -> str:
+    return 'unsplash_pool:' + hashlib.md5(query.encode()).hexdigest()
+
+
+def refresh_unsplash_pool(query: str = "cosmos") -> None:
+    """
+    Fetch a fresh photo list from Unsplash and store it in the cache.
+
+    An empty result keeps the previous pool, so a failed refresh never
+    wipes out photos we already have. After a failure the refresh lock is
+    left to expire, which rate-limits retries to one per UNSPLASH_RETRY_DELAY.
+    """
+    pool_key = _unsplash_pool_key(query)
+    photos = fetch_unsplash_photos(query)
+    if photos:
+        cache.set(pool_key, {'photos': photos, 'fetched_at': time.time()}, None)
+        cache.delete(f'{pool_key}:refreshing')
+
+
+def _unsplash_pool_is_stale(pool):
+    return pool is None or time.time() - pool['fetched_at'] > settings.UNSPLASH_POOL_TTL
+
+
+def _start_unsplash_refresh(query):
+    threading.Thread(target=refresh_unsplash_pool, args=(query,), daemon=True).start()
+
+
+def load_unsplash_photo(query: str = "cosmos") -> str | None:
+    """
+    Pick a random photo from the cached Unsplash pool for `query`.
+
+    The pool is refreshed in a background thread once it is older than
+    UNSPLASH_POOL_TTL (stale-while-revalidate), so the caller never waits on
+    Unsplash. Returns None while the pool is still empty.
+    """
+    pool_key = _unsplash_pool_key(query)
+    pool = cache.get(pool_key)
+
+    if _unsplash_pool_is_stale(pool):
+        # cache.add is atomic, so only one refresh runs per pool at a time.
+        if cache.add(f'{pool_key}:refreshing', True, settings.UNSPLASH_RETRY_DELAY):
+            _start_unsplash_refresh(query)
+
+    if not pool:
+        return None
+    return random.choice(pool['photos'])
+
+
+async def aload_unsplash_photo(query: str = "cosmos") -> str | None:
+    """
+    Async version of load_unsplash_photo(), for async views.
+    """
+    pool_key = _unsplash_pool_key(query)
+    pool = await cache.aget(pool_key)
+
+    if _unsplash_pool_is_stale(pool):
+        if await cache.aadd(f'{pool_key}:refreshing', True, settings.UNSPLASH_RETRY_DELAY):
+            _start_unsplash_refresh(query)
+
+    if not pool:
+        return None
+    return random.choice(pool['photos'])
 
-    return image_url
 
+def get_user_photo_url(profile, size=256):
+    """
+    Return the URL of the `size` px avatar thumbnail, falling back to the
+    default avatar while its thumbnails are still being generated.
 
-def get_user_photo_url(profile):
-    if profile.user_photo:
-        user_photo_path = profile.user_photo.path
-        if os.path.exists(user_photo_path):
-            return profile.user_photo.url
+    The original upload is never linked: it may still carry EXIF metadata
+    (camera, GPS position), which only the thumbnails are free of.
+    Resolved from the profile row alone: no filesystem or storage access.
+    """
+    if profile.user_photo and profile.avatar_hash:
+        return profile.user_photo.storage.url(thumbnail_name(profile.avatar_hash, size))
     return '/static/img/default_avatar.jpg'
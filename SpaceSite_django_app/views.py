@@ -1,23 +1,42 @@
-import os
+import hashlib
+import json
+from urllib.parse import urlencode
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required, user_passes_test
+from django.contrib.auth.views import redirect_to_login
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from django.http import HttpResponseRedirect
-from django.shortcuts import render, redirect, get_object_or_404
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F, Q
+from django.http import Http404, HttpResponse, HttpResponseForbidden, HttpResponseRedirect, JsonResponse
+from django.middleware.csrf import get_token
+from django.shortcuts import aget_object_or_404, render, redirect, get_object_or_404
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.crypto import constant_time_compare
 from django.utils.decorators import method_decorator
 from django.views import View
+from django.views.decorators.http import condition
+from django.views.static import serve
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 from templates import icons
+from .authentication import revoke_access_token_cookie, token_for_user
+from .avatars import schedule_avatar_processing
+from .caching import acache_feed_page, aget_cached_feed_page, render_post_fragments
+from .counters import record_post_created, record_post_deleted
 from .forms import UserRegistrationForm, UserProfileForm
+from .metrics import render_metrics
 from .models import User, UserProfile, Post, PostForm
-from .utils import load_unsplash_photo, set_top_message, get_user_photo_url
+from .pagination import apaginate_by_cursor, paginate_by_cursor
+from .search import MAX_OFFSET, search_posts
+from .storage import CONTENT_ADDRESSED_NAME
+from .utils import aload_unsplash_photo, set_top_message, pop_top_message, get_user_photo_url
 
 
 class MyTokenObtainPairView(TokenObtainPairView):
@@ -34,6 +53,36 @@ class MyTokenRefreshView(TokenRefreshView):
     pass
 
 
+def serve_avatar(request, path):
+    """
+    Serve an avatar thumbnail from MEDIA_ROOT, marking content-addressed files as immutable.
+
+    Original uploads are not served: they may still carry EXIF metadata.
+    Only routed when DEBUG is on; in production the web server serves media
+    and should apply the same rules to /media/avatars/ (see deploy/nginx.conf).
+    """
+    if not path.startswith('avatars/thumbs/'):
+        raise Http404
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    if CONTENT_ADDRESSED_NAME.match(path):
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
+def metrics(request):
+    """
+    Serve the request histograms and counters of this process in the Prometheus text format.
+
+    Requires METRICS_TOKEN as a bearer token; without one, it is only open with DEBUG on.
+    """
+    if not settings.METRICS_TOKEN:
+        if not settings.DEBUG:
+            return HttpResponseForbidden()
+    elif not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {settings.METRICS_TOKEN}'):
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 def is_admin(user):
     """
     Check if the user has the 'admin' role.
@@ -47,57 +96,212 @@ def is_admin(user):
     return user.is_authenticated and user.role == 'admin'
 
 
+def legacy_page(queryset, page, per_page=12):
+    """
+    Return page `page` of `queryset`, falling back to the first or last page.
+    The page's rows are fetched here, so it can be used from async code.
+    """
+    paginator = Paginator(queryset, per_page)
+    try:
+        page = paginator.page(page)
+    except PageNotAnInteger:
+        page = paginator.page(1)
+    except EmptyPage:
+        page = paginator.page(paginator.num_pages)
+    page.object_list = list(page.object_list)
+    return page
+
+
+def user_posts(user_id):
+    """
+    Posts of one user with only the columns the post lists show. Paginated
+    newest first, each slice is a range scan of the (user, created_at, id) index.
+    """
+    return Post.objects.filter(user_id=user_id).only('id', 'created_at', 'updated_at').with_preview()
+
+
+def page_etag(request, *parts):
+    """
+    Return an ETag for a page built from `parts` for the current visitor.
+
+    The visitor's identity and CSRF secret are included, since pages greet the
+    user by name and embed CSRF tokens that must not outlive a new login.
+    """
+    user = request.user
+    viewer = [user.pk, user.username, user.role] if user.is_authenticated else None
+    fingerprint = json.dumps([viewer, request.META.get('CSRF_COOKIE'), parts], cls=DjangoJSONEncoder)
+    return f'"{hashlib.md5(fingerprint.encode()).hexdigest()}"'
+
+
+def profile_etag(request, profile):
+    # The form's CSRF token would otherwise set the cookie after the ETag was computed.
+    get_token(request)
+    user = profile.user
+    return page_etag(request, profile.pk, profile.updated_at,
+                     user.username, user.email, user.role, user.post_count, user.last_post_at)
+
+
 class RootView(View):
     """
     View for the root page, displaying posts and a welcome message.
+
+    Async: under ASGI the page's I/O does not hold a worker thread.
     """
 
-    def get(self, request):
+    async def get(self, request):
         template_name = 'root.html'
-        top_message = request.session.get('top_message')
+        # Templates read request.user; resolve it here, where the database may be queried.
+        request.user = await request.auser()
+        # The top message may live in the session, which has no async API.
+        top_message = await sync_to_async(pop_top_message)(request)
+
+        # Anonymous visitors without a pending message all see the same page.
+        cacheable = (settings.FEED_PAGE_CACHE_TIMEOUT and top_message is None
+                     and not request.user.is_authenticated)
+        if cacheable:
+            response = await aget_cached_feed_page(request)
+            if response is not None:
+                return response
+
+        # Only the keys of the page first: they are read from the feed index and
+        # are all the ETag needs, so a 304 never loads the posts themselves.
+        keys = Post.objects.values('id', 'created_at', 'updated_at', 'user__username')
+
+        # Legacy ?page=N links keep working; everything else is keyset-paginated.
+        cursor_mode = 'page' not in request.GET
+        if cursor_mode:
+            posts = await apaginate_by_cursor(keys, request.GET.get('cursor'), 12)
+            navigation = [posts.previous_cursor, posts.next_cursor]
+        else:
+            posts = await sync_to_async(legacy_page)(keys.order_by('-created_at', '-id'), request.GET.get('page', 1))
+            navigation = [posts.number, posts.paginator.num_pages]
 
+        # A pending top message is shown once, so that page is never revalidated.
+        etag = None
         if top_message is None:
+            etag = page_etag(request, [(key['id'], key['updated_at'], key['user__username']) for key in posts],
+                             navigation)
+            not_modified = get_conditional_response(request, etag=etag)
+            if not_modified is not None:
+                return not_modified
+
             text = f"Hello, {request.user.username}!" if request.user.is_authenticated else "Welcome to our site!"
             top_message = {
                 "class": "alert alert-light rounded",
                 "icon": icons.HI_ICON,
                 "text": text
             }
-        else:
-            del request.session['top_message']
 
-        unsplash_photo = load_unsplash_photo('universe galaxy cosmos') or '/static/img/default_unsplash.jpg'
-        posts = Post.objects.all().order_by('-created_at')
+        ids = [key['id'] for key in posts]
+        loaded = {post.id: post async for post in Post.objects.select_related('user').with_preview().filter(id__in=ids)}
+        # Keep the page order; a post deleted in between is left out.
+        posts.object_list = [loaded[pk] for pk in ids if pk in loaded]
 
-        page = request.GET.get('page', 1)
-        paginator = Paginator(posts, 12)
-
-        try:
-            posts = paginator.page(page)
-        except PageNotAnInteger:
-            posts = paginator.page(1)
-        except EmptyPage:
-            posts = paginator.page(paginator.num_pages)
+        unsplash_photo = await aload_unsplash_photo('universe galaxy cosmos') or '/static/img/default_unsplash.jpg'
 
         context = {
             "user": request.user if request.user.is_authenticated else None,
             "top_message": top_message,
             "unsplash_photo": unsplash_photo,
-            "posts": posts
+            "posts": posts,
+            # Fragment lookups and renders use the sync cache API.
+            "post_fragments": await sync_to_async(render_post_fragments)(posts),
+            "cursor_mode": cursor_mode,
+        }
+        response = render(request, template_name, context)
+        if etag is not None:
+            response['ETag'] = etag
+        if cacheable:
+            await acache_feed_page(request, response)
+        return response
+
+
+def wants_json(request):
+    return request.GET.get('format') == 'json' or 'application/json' in request.headers.get('Accept', '')
+
+
+def post_detail_etag(request, post_id):
+    # The author's name is shown too, and a rename does not touch the post.
+    row = Post.objects.filter(id=post_id).values_list('updated_at', 'user__username').first()
+    if row is None:
+        return None
+    updated_at, username = row
+    fingerprint = hashlib.md5(username.encode()).hexdigest()[:8]
+    return f'"{post_id}-{updated_at.timestamp()}-{fingerprint}-{"json" if wants_json(request) else "html"}"'
+
+
+@method_decorator(condition(etag_func=post_detail_etag), name='get')
+class PostDetailView(View):
+    """
+    One post in full: the HTML fragment the home page modal loads on click,
+    or JSON with ?format=json or an "Accept: application/json" header.
+
+    The ETag follows the post's updated_at and its author's username, so
+    revalidating an unchanged post costs one primary key lookup and a 304.
+    """
+    template_name = 'include/post_detail.html'
+
+    def get(self, request, post_id):
+        post = get_object_or_404(
+            Post.objects.select_related('user').only('content', 'created_at', 'updated_at', 'user__username'),
+            id=post_id)
+        if wants_json(request):
+            response = JsonResponse({
+                'id': post.id,
+                'author': post.user.username,
+                'content': post.content,
+                'created_at': post.created_at,
+                'updated_at': post.updated_at,
+            })
+        else:
+            response = render(request, self.template_name, {'post': post})
+        patch_vary_headers(response, ['Accept'])
+        # Browsers and proxies may keep it, but must revalidate with the ETag.
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+
+class SearchView(View):
+    """
+    View for full-text search over posts.
+    """
+    template_name = 'search.html'
+    per_page = 20
+
+    def get(self, request):
+        query = request.GET.get('q', '').strip()
+        try:
+            page = min(max(int(request.GET.get('page', 1)), 1), MAX_OFFSET // self.per_page + 1)
+        except ValueError:
+            page = 1
+
+        results = []
+        if query:
+            # One extra row tells whether there is a next page without a COUNT.
+            results = search_posts(query, self.per_page + 1, (page - 1) * self.per_page)
+        has_next = len(results) > self.per_page and page * self.per_page <= MAX_OFFSET
+
+        context = {
+            'top_message': pop_top_message(request),
+            'query': query,
+            'results': results[:self.per_page],
+            'page': page,
+            'has_next': has_next,
+            'filter_params': urlencode({'q': query}),
         }
-        return render(request, template_name, context)
+        return render(request, self.template_name, context)
 
 
 class LoginView(APIView):
     """
     View for user login.
     """
+    # Session based; a stale API token cookie must not get in the way.
+    authentication_classes = []
     template_name = 'user/login.html'
 
     def get(self, request, *args, **kwargs):
-        top_message = request.session.get('top_message')
-        if top_message:
-            request.session.pop('top_message', None)
+        top_message = pop_top_message(request)
         user_form = UserRegistrationForm()
         profile_form = UserProfileForm()
         context = {
@@ -131,6 +335,7 @@ class LogoutView(APIView):
     """
     View for user logout.
     """
+    authentication_classes = []
 
     def get(self, request):
         logout(request)
@@ -138,7 +343,7 @@ class LogoutView(APIView):
                         message_class=icons.INFO_CLASS,
                         message_icon=icons.WARNING_ICON,
                         message_text="You have been logged out successfully.")
-        return HttpResponseRedirect(reverse('login'))
+        return revoke_access_token_cookie(request, HttpResponseRedirect(reverse('login')))
 
 
 class RegisterView(View):
@@ -148,9 +353,7 @@ class RegisterView(View):
     template_name = 'user/register.html'
 
     def get(self, request, *args, **kwargs):
-        top_message = request.session.get('top_message')
-        if top_message:
-            request.session.pop('top_message', None)
+        top_message = pop_top_message(request)
         user_form = UserRegistrationForm()
         profile_form = UserProfileForm()
         context = {
@@ -172,8 +375,10 @@ class RegisterView(View):
             profile = profile_form.save(commit=False)
             profile.user = user
             profile.save()
+            if profile.user_photo:
+                schedule_avatar_processing(profile.user_photo.name)
             login(request, user)
-            refresh = RefreshToken.for_user(user)
+            refresh = token_for_user(user)
             access_token = str(refresh.access_token)
             response = HttpResponseRedirect(reverse('root'))
             response.set_cookie('access_token', access_token, httponly=True)
@@ -185,24 +390,32 @@ class RegisterView(View):
         return render(request, self.template_name, {'user_form': user_form, 'profile_form': profile_form})
 
 
-@method_decorator(login_required, name='dispatch')
 class ProfileView(View):
     template_name = 'user/profile.html'
 
-    def get_object(self, user_id):
-        user = get_object_or_404(User, id=user_id)
-        profile, created = UserProfile.objects.get_or_create(user=user)
+    async def get_object(self, user_id):
+        user = await aget_object_or_404(User, id=user_id)
+        profile, created = await UserProfile.objects.select_related('user').aget_or_create(user=user)
         return profile
 
-    def get(self, request, user_id):
-        profile = self.get_object(user_id)
+    async def get(self, request, user_id):
+        # login_required only supports async views from Django 5.1 on.
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        profile = await self.get_object(user_id)
         if profile.user != request.user and request.user.role != 'admin':
             return redirect('profile', user_id=request.user.id)
-        form = UserProfileForm(instance=profile, user=request.user)
-        top_message = request.session.get('top_message')
-        if top_message:
-            del request.session['top_message']
+        top_message = await sync_to_async(pop_top_message)(request)
+
+        etag = None
+        if top_message is None:
+            etag = profile_etag(request, profile)
+            not_modified = get_conditional_response(request, etag=etag)
+            if not_modified is not None:
+                return not_modified
 
+        form = UserProfileForm(instance=profile, user=request.user)
         user_photo_url = get_user_photo_url(profile)
 
         context = {
@@ -211,7 +424,10 @@ class ProfileView(View):
             'top_message': top_message,
             'user_photo_url': user_photo_url,
         }
-        return render(request, self.template_name, context)
+        response = render(request, self.template_name, context)
+        if etag is not None:
+            response['ETag'] = etag
+        return response
 
 
 @method_decorator(login_required, name='dispatch')
@@ -226,23 +442,16 @@ class ProfileUpdateView(View):
         if profile.user != request.user and not request.user.role == 'admin':
             return redirect('profile', user_id=request.user.id)
 
-        old_avatar_path = None
-        if profile.user_photo:
-            old_avatar_path = os.path.normpath(
-                os.path.join(settings.MEDIA_ROOT, 'avatars', os.path.basename(profile.user_photo.name)))
-
         form = UserProfileForm(request.POST, request.FILES, instance=profile)
         if form.is_valid():
             profile = form.save(commit=False)
             if 'user_photo' in request.FILES:
                 profile.user_photo = request.FILES['user_photo']
+                profile.avatar_hash = ''
             profile.save()
 
-            if old_avatar_path:
-                try:
-                    os.remove(old_avatar_path)
-                except Exception as e:
-                    pass
+            if 'user_photo' in request.FILES:
+                schedule_avatar_processing(profile.user_photo.name)
 
             set_top_message(request,
                             message_class=icons.OK_CLASS,
@@ -270,22 +479,13 @@ class DeleteProfileView(View):
         if profile.user != request.user and not request.user.role == 'admin':
             return redirect('profile', user_id=request.user.id)
         user = profile.user
-        if profile.user_photo:
-            old_avatar_path = os.path.normpath(
-                os.path.join(settings.MEDIA_ROOT, 'avatars', os.path.basename(profile.user_photo.name)))
-            try:
-                os.remove(old_avatar_path)
-            except Exception as e:
-                pass
         user.delete()
         set_top_message(request,
                         message_class=icons.WARNING_CLASS,
                         message_icon=icons.USER_DELETE_ICON,
                         message_text=f"{user.username} has been deleted!")
         logout(request)
-        response = redirect('login')
-        response.delete_cookie('access_token')
-        return response
+        return revoke_access_token_cookie(request, redirect('login'))
 
 
 @method_decorator(login_required, name='dispatch')
@@ -304,7 +504,9 @@ class CreatePostView(View):
         if form.is_valid():
             post = form.save(commit=False)
             post.user = request.user
-            post.save()
+            with transaction.atomic():
+                post.save()
+                record_post_created(post)
             set_top_message(request,
                             message_class=icons.OK_CLASS,
                             message_icon=icons.OK_ICON,
@@ -315,14 +517,44 @@ class CreatePostView(View):
 
 class PostListView(View):
     """
-    View for listing user's posts.
+    View for listing user's posts, a slice at a time.
+
+    With fragment=True (the "load more" endpoint) only the list items of the
+    requested slice are rendered.
     """
     template_name = 'user/my_posts.html'
+    fragment_template_name = 'include/post_list_items.html'
+    fragment = False
+    per_page = 20
 
-    @method_decorator(login_required)
-    def get(self, request):
-        posts = Post.objects.filter(user=request.user).order_by('-created_at')
-        return render(request, self.template_name, {'posts': posts, 'username': request.user.username})
+    async def get(self, request):
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        # Only the keys of the slice first, from the (user, created_at, id) index:
+        # a 304 never loads the previews.
+        keys = Post.objects.filter(user_id=request.user.id).values('id', 'created_at', 'updated_at')
+        posts = await apaginate_by_cursor(keys, request.GET.get('cursor'), self.per_page)
+        # The header shows the counters of request.user, which is already loaded.
+        etag = page_etag(request, self.fragment, [(key['id'], key['updated_at']) for key in posts],
+                         posts.next_cursor, request.user.post_count, request.user.last_post_at)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+        ids = [key['id'] for key in posts]
+        loaded = {post.id: post async for post in user_posts(request.user.id).filter(id__in=ids)}
+        # Keep the slice order; a post deleted in between is left out.
+        posts.object_list = [loaded[pk] for pk in ids if pk in loaded]
+
+        context = {'posts': posts, 'more_url': reverse('my_posts_more')}
+        if self.fragment:
+            response = render(request, self.fragment_template_name, context)
+        else:
+            context.update(username=request.user.username, owner=request.user)
+            response = render(request, self.template_name, context)
+        response['ETag'] = etag
+        return response
 
 
 class PostEditView(View):
@@ -365,8 +597,10 @@ class PostDeleteView(View):
     @method_decorator(login_required)
     def post(self, request, post_id):
         post = get_object_or_404(Post, id=post_id)
-        user_id = post.user.id
-        post.delete()
+        user_id = post.user_id
+        with transaction.atomic():
+            post.delete()
+            record_post_deleted(user_id)
         set_top_message(request,
                         message_class=icons.WARNING_CLASS,
                         message_icon=icons.WARNING_ICON,
@@ -382,6 +616,11 @@ class AdminUserListView(LoginRequiredMixin, View):
     View for listing all users (admin only).
     """
     template_name = 'admin/user_list.html'
+    orderings = {
+        '': ('username',),
+        'posts': ('-post_count', 'username'),
+        'last_post': (F('last_post_at').desc(nulls_last=True), 'username'),
+    }
 
     def dispatch(self, request, *args, **kwargs):
         if not request.user.is_authenticated:
@@ -393,8 +632,45 @@ class AdminUserListView(LoginRequiredMixin, View):
         return super().dispatch(request, *args, **kwargs)
 
     def get(self, request):
-        users = User.objects.all()
-        return render(request, self.template_name, {'users': users})
+        query = request.GET.get('q', '').strip()
+        role = request.GET.get('role', '')
+        sort = request.GET.get('sort', '')
+
+        users = User.objects.only('id', 'username', 'email', 'role', *User.COUNTER_FIELDS)
+        if sort not in self.orderings:
+            sort = ''
+        users = users.order_by(*self.orderings[sort])
+        if query:
+            # The range bounds let every backend answer the prefix match from the unique
+            # btree indexes; startswith keeps the result exact.
+            upper = query + '\U0010ffff'
+            users = users.filter(
+                Q(username__gte=query, username__lt=upper, username__startswith=query)
+                | Q(email__gte=query, email__lt=upper, email__startswith=query)
+            )
+        if role in dict(User.ROLE_CHOICES):
+            users = users.filter(role=role)
+        else:
+            role = ''
+
+        paginator = Paginator(users, 50)
+        try:
+            users = paginator.page(request.GET.get('page', 1))
+        except PageNotAnInteger:
+            users = paginator.page(1)
+        except EmptyPage:
+            users = paginator.page(paginator.num_pages)
+
+        context = {
+            'users': users,
+            'query': query,
+            'role': role,
+            'roles': User.ROLE_CHOICES,
+            'sort': sort,
+            'filter_params': urlencode({key: value for key, value in (('q', query), ('role', role), ('sort', sort))
+                                        if value}),
+        }
+        return render(request, self.template_name, context)
 
 
 @method_decorator(user_passes_test(is_admin), name='dispatch')
@@ -415,14 +691,21 @@ class AdminUserProfileView(LoginRequiredMixin, View):
 
     def get_object(self, user_id):
         user = get_object_or_404(User, id=user_id)
-        profile, created = UserProfile.objects.get_or_create(user=user)
+        profile, created = UserProfile.objects.select_related('user').get_or_create(user=user)
         return profile
 
     def get(self, request, user_id):
         profile = self.get_object(user_id)
+        etag = profile_etag(request, profile)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
         form = UserProfileForm(instance=profile, user=request.user)
         user_photo_url = get_user_photo_url(profile)
-        return render(request, self.template_name, {'form': form, 'profile': profile, 'user_photo_url': user_photo_url})
+        response = render(request, self.template_name,
+                          {'form': form, 'profile': profile, 'user_photo_url': user_photo_url})
+        response['ETag'] = etag
+        return response
 
 
 @method_decorator(user_passes_test(is_admin), name='dispatch')
@@ -444,23 +727,16 @@ class AdminUserProfileEditView(LoginRequiredMixin, View):
     def post(self, request, user_id):
         profile = get_object_or_404(UserProfile, user_id=user_id)
 
-        old_avatar_path = None
-        if profile.user_photo:
-            old_avatar_path = os.path.normpath(
-                os.path.join(settings.MEDIA_ROOT, 'avatars', os.path.basename(profile.user_photo.name)))
-
         form = UserProfileForm(request.POST, request.FILES, instance=profile, user=request.user)
         if form.is_valid():
             profile = form.save(commit=False)
             if 'user_photo' in request.FILES:
                 profile.user_photo = request.FILES['user_photo']
+                profile.avatar_hash = ''
             profile.save()
 
-            if old_avatar_path:
-                try:
-                    os.remove(old_avatar_path)
-                except Exception as e:
-                    pass
+            if 'user_photo' in request.FILES:
+                schedule_avatar_processing(profile.user_photo.name)
 
             if 'role' in form.cleaned_data:
                 profile.user.role = form.cleaned_data['role']
@@ -473,9 +749,12 @@ class AdminUserProfileEditView(LoginRequiredMixin, View):
 @method_decorator(user_passes_test(is_admin), name='dispatch')
 class AdminUserPostsView(LoginRequiredMixin, View):
     """
-    View for listing user's posts (admin only).
+    View for listing user's posts (admin only), a slice at a time like PostListView.
     """
     template_name = 'user/my_posts.html'
+    fragment_template_name = 'include/post_list_items.html'
+    fragment = False
+    per_page = 20
 
     def dispatch(self, request, *args, **kwargs):
         if not request.user.is_authenticated:
@@ -487,9 +766,13 @@ class AdminUserPostsView(LoginRequiredMixin, View):
         return super().dispatch(request, *args, **kwargs)
 
     def get(self, request, user_id):
-        posts = Post.objects.filter(user_id=user_id).order_by('-created_at')
-        username = User.objects.get(id=user_id).username
-        return render(request, self.template_name, {'posts': posts, 'username': username})
+        posts = paginate_by_cursor(user_posts(user_id), request.GET.get('cursor'), self.per_page)
+        context = {'posts': posts, 'more_url': reverse('admin_user_posts_more', args=[user_id])}
+        if self.fragment:
+            return render(request, self.fragment_template_name, context)
+        owner = get_object_or_404(User.objects.only('username', *User.COUNTER_FIELDS), id=user_id)
+        context.update(username=owner.username, owner=owner)
+        return render(request, self.template_name, context)
 
 
 @method_decorator(user_passes_test(is_admin), name='dispatch')
@@ -545,13 +828,6 @@ class AdminDeleteProfileView(LoginRequiredMixin, View):
     def post(self, request, user_id):
         profile = get_object_or_404(UserProfile, user_id=user_id)
         user = profile.user
-        if profile.user_photo:
-            old_avatar_path = os.path.normpath(
-                os.path.join(settings.MEDIA_ROOT, 'avatars', os.path.basename(profile.user_photo.name)))
-            try:
-                os.remove(old_avatar_path)
-            except Exception as e:
-                pass
         user.delete()
         set_top_message(request,
                         message_class=icons.WARNING_CLASS,
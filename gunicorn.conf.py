@@ -0,0 +1,20 @@
+# gunicorn.conf.py
+# Run with: gunicorn -c gunicorn.conf.py
+import multiprocessing
+import os
+
+# The ASGI application with uvicorn workers: one process serves many concurrent
+# requests while async views wait on I/O. For the WSGI application use
+# GUNICORN_APP=SpaceSite_django.wsgi:application GUNICORN_WORKER_CLASS=gthread.
+wsgi_app = os.getenv('GUNICORN_APP', 'SpaceSite_django.asgi:application')
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'uvicorn_worker.UvicornWorker')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then to bound memory growth.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '10000'))
+max_requests_jitter = 1000
+accesslog = '-'